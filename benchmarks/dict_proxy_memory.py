@@ -0,0 +1,68 @@
+"""
+A memory benchmark of DictProxy - the lazy ext.structs.DictProxy against the eager implementation it replaced,
+which wrapped every nested dict up front and gave each instance a __dict__.
+
+Every JSON file in data/ and data/locale/ is loaded COPIES times (standing in for more locales),
+each implementation in a fresh interpreter, and the growth in RSS is reported.
+
+Run from the repository root with: python -m benchmarks.dict_proxy_memory
+"""
+
+import os
+import sys
+import json
+import subprocess
+from typing import Any, Union, Optional, Iterator, List
+
+COPIES: int = 50
+FILES: List[str] = [os.path.join(d, f) for d in ('data', 'data/locale') for f in sorted(os.listdir(d))
+                    if f.endswith('.json')]
+
+
+class EagerDictProxy(dict):
+    def __init__(self, data: Optional[Union[list, dict]] = None):
+        if data is None:
+            data: dict = {}
+        self.__items: Union[list, dict] = data
+        if isinstance(data, dict):
+            super().__init__(data)
+            for k, v in data.items():
+                setattr(self, k.casefold(), (v if not isinstance(v, dict) else EagerDictProxy(v)))
+        else:
+            self.__getitem__ = lambda i: self.__items[i]
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.__items
+
+    def __getattr__(self, item: Union[str, int]) -> Any:
+        return super().__getitem__(item.casefold())
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        return super().__setitem__(key.casefold(), value)
+
+
+def rss() -> int:
+    with open('/proc/self/statm') as fp:
+        return int(fp.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def measure(implementation: str) -> None:
+    if implementation == 'lazy':
+        from ext.structs.proxies.dict_proxy import DictProxy as proxy
+    else:
+        proxy = EagerDictProxy
+    raw: list = []
+    for path in FILES:
+        with open(path, 'r') as fp:
+            raw.append(fp.read())
+    before: int = rss()
+    loaded: list = [proxy(json.loads(content)) for _ in range(COPIES) for content in raw]
+    print(f'{implementation:>5}: {(rss() - before) / 1024 ** 2:.2f}mb for {len(loaded)} files')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        measure(sys.argv[1])
+    else:
+        for impl in ('eager', 'lazy'):
+            subprocess.run([sys.executable, '-m', 'benchmarks.dict_proxy_memory', impl], check=True)
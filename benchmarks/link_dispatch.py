@@ -0,0 +1,34 @@
+"""
+A micro-benchmark of link classification - the combined ext.regex.LINK_RE against
+running re.findall with each of the patterns in turn, as Manager.get_link_reference used to.
+
+Run from the repository root with: python -m benchmarks.link_dispatch
+"""
+
+import re
+import timeit
+from ext import regex
+from typing import Optional, Tuple, Union
+
+LINKS: tuple = ('https://github.com/statch/gitbot/blob/main/bot.py#L10-L20',
+                'https://gitlab.com/gitlab-org/gitlab/-/blob/master/README.md#L5',
+                'https://github.com/statch/gitbot/issues/42',
+                'https://github.com/statch/gitbot/pull/7',
+                'https://github.com/statch/gitbot',
+                'https://github.com/statch',
+                'https://example.com/not/a/match')
+ROUNDS: int = 100_000
+
+
+def match_link_sequential(link: str) -> Optional[Tuple[str, Union[str, tuple]]]:
+    for pattern, type_ in regex.LINK_PATTERNS:
+        if match := re.findall(pattern, link):
+            return type_, match[0]
+
+
+if __name__ == '__main__':
+    for link in LINKS:
+        assert regex.match_link(link) == match_link_sequential(link), link
+    for name, func in (('sequential', match_link_sequential), ('combined', regex.match_link)):
+        elapsed: float = timeit.timeit(lambda: [func(link) for link in LINKS], number=ROUNDS)
+        print(f'{name:>10}: {elapsed / (ROUNDS * len(LINKS)) * 1e6:.2f}µs per link')
@@ -31,6 +31,7 @@ logger: logging.Logger = logging.getLogger('main')
 
 extensions: list = [
     'core.background.misc',
+    'core.background.github_webhooks',
     'core.debug',
     'cogs.github.base.user',
     'cogs.github.base.org',
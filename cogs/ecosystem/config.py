@@ -21,6 +21,7 @@ class Config(commands.Cog):
                            f"`git config --repo {{{ctx.l.argument_placeholders.repo}}}` " + Mgr.e.arrow + " " + ctx.l.config.default.commands.repo,
                            f"`git config --language` " + Mgr.e.arrow + " " + ctx.l.config.default.commands.locale,
                            f"`git config --feed {{{ctx.l.argument_placeholders.repo}}}` " + Mgr.e.arrow + " " + ctx.l.config.default.commands.feed,
+                           f"`git config --unfurl` " + Mgr.e.arrow + " " + ctx.l.config.default.commands.unfurl,
                            "`git commits` " + Mgr.e.arrow + " " + ctx.l.help.utility.commands.commits,
                            "\n" + ctx.l.config.default.deletion]
             embed = discord.Embed(
@@ -35,12 +36,12 @@ class Config(commands.Cog):
     @commands.cooldown(15, 30, commands.BucketType.user)
     async def config_show_command(self, ctx: commands.Context) -> None:
         ctx.fmt.set_prefix('config show')
-        query: dict = await Mgr.db.users.find_one({"_id": int(ctx.author.id)})
+        query: dict = await Mgr.db.users.find_one({"_id": int(ctx.author.id)}) or {}
         if not isinstance(ctx.channel, discord.DMChannel):
-            release: Optional[dict] = await Mgr.db.guilds.find_one({'_id': ctx.guild.id})
+            release: Optional[dict] = await Mgr.db.guilds.get_cached(ctx.guild.id)
         else:
             release = None
-        if query is None and release is None or release and len(release) == 1 and query is None:
+        if not query and not (release and any(k in release for k in ('hook', 'feed', 'unfurl'))):
             await ctx.err(ctx.l.generic.nonexistent.qa)
             return
         lang: str = ctx.fmt('accessibility list locale', f'`{ctx.l.meta.localized_name.capitalize()}`')
@@ -48,11 +49,13 @@ class Config(commands.Cog):
         org: str = ctx.fmt('qa list org', f'`{query["org"]}`' if 'org' in query else f'`{ctx.l.config.show.item_not_set}`')
         repo: str = ctx.fmt('qa list repo', f'`{query["repo"]}`' if 'repo' in query else f'`{ctx.l.config.show.item_not_set}`')
         feed: str = f'{ctx.l.config.show.guild.list.feed}\n' + '\n'.join(
-            [f'{Mgr.e.square} `{r["repo"]}`' for r in release['feed']]) if release and release[
-            'feed'] else f'{ctx.l.config.show.guild.list.feed} `{ctx.l.config.show.item_not_configured}`'
+            [f'{Mgr.e.square} `{r["repo"]}`' for r in release['feed']]) if release and release.get(
+            'feed') else f'{ctx.l.config.show.guild.list.feed} `{ctx.l.config.show.item_not_configured}`'
+        unfurl: str = ctx.fmt('guild list unfurl', f'`{ctx.l.config.show.item_enabled}`' if release and release.get(
+            'unfurl') else f'`{ctx.l.config.show.item_not_configured}`')
         accessibility: list = ctx.l.config.show.accessibility.heading + '\n' + '\n'.join([lang])
         qa: list = ctx.l.config.show.qa.heading + '\n' + '\n'.join([user, org, repo])
-        guild: list = ctx.l.config.show.guild.heading + '\n' + '\n'.join([feed])
+        guild: list = ctx.l.config.show.guild.heading + '\n' + '\n'.join([feed, unfurl])
         shortest_heading_len: int = min(map(len, [ctx.l.config.show.accessibility.heading,
                                                   ctx.l.config.show.guild.heading,
                                                   ctx.l.config.show.qa.heading]))
@@ -71,8 +74,8 @@ class Config(commands.Cog):
     @commands.cooldown(3, 30, commands.BucketType.guild)
     async def config_release_feed_command(self, ctx: commands.Context, repo: Optional[str] = None) -> None:
         ctx.fmt.set_prefix('config feed')
-        g: dict = await Mgr.db.guilds.find_one({'_id': ctx.guild.id})
-        if not g:
+        g: Optional[dict] = await Mgr.db.guilds.get_cached(ctx.guild.id)
+        if not g or 'hook' not in g:
             embed: discord.Embed = discord.Embed(
                 color=0xff009b,
                 title=ctx.l.config.feed.embeds.start.title,
@@ -109,8 +112,11 @@ class Config(commands.Cog):
                         feed: list = [{'repo': repo.lower(), 'release': r['release']['tagName']}] if r and r[
                             'release'] else []
                     if hook:
-                        await Mgr.db.guilds.insert_one(
-                            {'_id': ctx.guild.id, 'hook': hook.url[33:], 'feed': feed if feed else []})
+                        await Mgr.db.guilds.update_one({'_id': ctx.guild.id},
+                                                       {'$set': {'hook': hook.url[33:], 'feed': feed if feed else []}},
+                                                       upsert=True)
+                        for item in feed:
+                            await Mgr.db.feed_subscriptions.subscribe(item['repo'], ctx.guild.id, item['release'])
                         success_embed: discord.Embed = discord.Embed(
                             color=0x33ba7c,
                             title=ctx.l.config.feed.embeds.success.title,
@@ -141,6 +147,7 @@ class Config(commands.Cog):
         r: dict = await Git.get_latest_release(repo)
         if not r:
             await ctx.err(ctx.l.generic.nonexistent.repo.base)
+            return
         if g:
             for r_ in g['feed']:
                 if r_['repo'].lower() == repo.lower():
@@ -149,6 +156,7 @@ class Config(commands.Cog):
             if len(g['feed']) < 3:
                 await Mgr.db.guilds.update_one({'_id': ctx.guild.id},
                                                {'$push': {'feed': {'repo': repo, 'release': r['release']['tagName'] if r['release'] else None}}})
+                await Mgr.db.feed_subscriptions.subscribe(repo, ctx.guild.id, r['release']['tagName'] if r['release'] else None)
                 await ctx.err(ctx.fmt('success', repo))
             else:
                 embed_limit_reached: discord.Embed = discord.Embed(
@@ -160,6 +168,16 @@ class Config(commands.Cog):
                                                icon_url=self.bot.user.avatar_url)
                 await ctx.send(embed=embed_limit_reached)
 
+    @config_command_group.command(name='--unfurl', aliases=['-unfurl', 'unfurl', '--previews', '-previews', 'previews'])
+    @commands.guild_only()
+    @commands.has_guild_permissions(manage_guild=True)
+    @commands.cooldown(3, 30, commands.BucketType.guild)
+    async def config_unfurl_command(self, ctx: commands.Context, state: Optional[bool] = None) -> None:
+        if state is None:
+            state: bool = not await Mgr.get_unfurl(ctx.guild.id)
+        await Mgr.db.guilds.update_one({'_id': ctx.guild.id}, {'$set': {'unfurl': state}}, upsert=True)
+        await ctx.send(f"{Mgr.e.github}  {ctx.l.config.unfurl.enabled if state else ctx.l.config.unfurl.disabled}")
+
     @config_command_group.command(name='--user', aliases=['-u', '-user', 'user'])
     @commands.cooldown(5, 30, commands.BucketType.user)
     async def config_user_command(self, ctx: commands.Context, user: str) -> None:
@@ -229,7 +247,6 @@ class Config(commands.Cog):
                         return
                 await Mgr.db.users.setitem(ctx, 'locale', l_[0]['name'])
                 setattr(ctx, 'l', await Mgr.get_locale(ctx))
-                Mgr.locale_cache[ctx.author.id] = l_[0]['name']
                 await ctx.send(f"{Mgr.e.github}  {ctx.fmt('success', l_[0]['localized_name'].capitalize())}")
                 return
             else:
@@ -281,12 +298,13 @@ class Config(commands.Cog):
                 )
                 await ctx.send(embed=embed)
             else:
-                guild: Optional[dict] = await Mgr.db.guilds.find_one({'_id': ctx.guild.id})
-                if guild:
+                guild: Optional[dict] = await Mgr.db.guilds.get_cached(ctx.guild.id)
+                if guild and 'hook' in guild:
                     for r in guild['feed']:
                         if r['repo'].lower() == repo.lower():
                             guild['feed'].remove(r)
                             await Mgr.db.guilds.update_one({'_id': ctx.guild.id}, {'$set': {'feed': guild['feed']}})
+                            await Mgr.db.feed_subscriptions.unsubscribe(r['repo'], ctx.guild.id)
                             await ctx.send(f'{Mgr.e.github}  {ctx.l.config.delete.feed.repo.success.format(repo)}')
                             return
                     await ctx.err(ctx.l.config.delete.feed.repo.not_logged)
@@ -298,12 +316,13 @@ class Config(commands.Cog):
     @commands.cooldown(5, 30, commands.BucketType.guild)
     @commands.has_guild_permissions(manage_guild=True, manage_channels=True)
     async def delete_all_feeds_command(self, ctx: commands.Context) -> None:
-        guild: Optional[dict] = await Mgr.db.guilds.find_one({'_id': ctx.guild.id})
+        guild: Optional[dict] = await Mgr.db.guilds.get_cached(ctx.guild.id)
         if guild is None:
             await ctx.err(ctx.l.config.delete.feed.nothing_deleted)
         else:
-            if guild['feed']:
-                await Mgr.db.guilds.update_one(guild, {'$set': {'feed': []}})
+            if guild.get('feed'):
+                await Mgr.db.guilds.update_one({'_id': ctx.guild.id}, {'$set': {'feed': []}})
+                await Mgr.db.feed_subscriptions.unsubscribe_guild(ctx.guild.id)
             await ctx.send(f'{Mgr.e.github}  {ctx.l.config.delete.feed.all.success}')
 
     @delete_feed_group.command(name='total', aliases=['-total', '--total', '-t'])
@@ -312,11 +331,12 @@ class Config(commands.Cog):
     @commands.has_guild_permissions(manage_guild=True, manage_channels=True)
     @commands.bot_has_guild_permissions()
     async def delete_feed_with_channel_command(self, ctx: commands.Context) -> None:
-        guild: Optional[dict] = await Mgr.db.guilds.find_one({'_id': ctx.guild.id})
-        if guild is None:
+        guild: Optional[dict] = await Mgr.db.guilds.get_cached(ctx.guild.id)
+        if guild is None or 'hook' not in guild:
             await ctx.err(ctx.l.config.delete.feed.nothing_deleted)
         else:
-            await Mgr.db.guilds.delete_one(guild)
+            await Mgr.db.guilds.update_one({'_id': ctx.guild.id}, {'$unset': {'hook': '', 'feed': ''}})
+            await Mgr.db.feed_subscriptions.unsubscribe_guild(ctx.guild.id)
             try:
                 webhook: discord.Webhook = discord.Webhook.from_url('https://discord.com/api/webhooks/' + guild['hook'],
                                                                     adapter=discord.AsyncWebhookAdapter(Git.ses))
@@ -357,6 +377,7 @@ class Config(commands.Cog):
     @commands.cooldown(5, 30, commands.BucketType.user)
     async def delete_locale_command(self, ctx: commands.Context) -> None:
         await Mgr.db.users.delitem(ctx, 'locale')
+        setattr(ctx, 'l', await Mgr.get_locale(ctx))
         await ctx.send(f"{Mgr.e.github}  {ctx.l.config.delete.locale}")
 
     @delete_field_group.command(name='all', aliases=['-A', '-all'])
@@ -366,6 +387,8 @@ class Config(commands.Cog):
         if not query:
             await ctx.err(ctx.l.config.delete.all.not_saved)
             return
+        setattr(ctx, 'user_doc', {})
+        setattr(ctx, 'l', await Mgr.get_locale(ctx))
         await ctx.send(f"{Mgr.e.github}  {ctx.l.config.delete.all.success}")
 
 
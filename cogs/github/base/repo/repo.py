@@ -1,7 +1,6 @@
 import discord
 import datetime
 import re
-import io
 from .list_plugin import *
 from babel.dates import format_date
 from discord.ext import commands
@@ -156,19 +155,20 @@ class Repo(commands.Cog):
         await ctx.send(embed=embed)
 
     @repo_command_group.command(name='--download', aliases=['-download', 'download', '-dl'])
-    @commands.max_concurrency(10, commands.BucketType.default, wait=False)
     @commands.cooldown(5, 30, commands.BucketType.user)
     async def download_command(self, ctx: commands.Context, repo: str) -> None:
         ctx.fmt.set_prefix('repo download')
-        msg: discord.Message = await ctx.send(f"{Mgr.e.github}  {ctx.l.repo.download.wait}")
-        src_bytes: Optional[Union[bytes, bool]] = await Git.get_repo_zip(repo)
-        if src_bytes is None:  # pylint: disable=no-else-return
+        if Git.zipballs.busy:
+            msg: discord.Message = await ctx.send(f"{Mgr.e.github}  {ctx.fmt('queued', Git.zipballs.waiting + 1)}")
+        else:
+            msg: discord.Message = await ctx.send(f"{Mgr.e.github}  {ctx.l.repo.download.wait}")
+        src: Optional[Union[str, bool]] = await Git.zipballs.get(repo)
+        if src is None:  # pylint: disable=no-else-return
             return await msg.edit(content=f"{Mgr.e.err}  {ctx.l.generic.nonexistent.repo}")
-        elif src_bytes is False:
+        elif src is False:
             return await msg.edit(
                 content=f"{Mgr.e.err}  {ctx.fmt('file_too_big', f'https://github.com/{repo}')}")
-        io_obj: io.BytesIO = io.BytesIO(src_bytes)
-        file: discord.File = discord.File(filename=f'{repo.replace("/", "-")}.zip', fp=io_obj)
+        file: discord.File = discord.File(src, filename=f'{repo.replace("/", "-")}.zip')
         try:
             await ctx.send(file=file)
             await msg.edit(content=f'{Mgr.e.github}  {ctx.fmt("done", repo)}')
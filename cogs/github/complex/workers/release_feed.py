@@ -1,44 +1,136 @@
+import time
 import asyncio
 import discord
 import datetime
 from bot import logger
 from bs4 import BeautifulSoup
-from typing import List, Tuple, Optional
+from typing import List, Optional, Dict
 from discord.ext import tasks, commands
 from core.globs import Git, Mgr
+from core.net.discord.webhooks import WebhookQueue
+from ext.structs import TimingWheel
+from ext.structs.db.feed_subscription_collection import repo_filter
+
+
+MIN_POLL_INTERVAL: int = 10 * 60
+MAX_POLL_INTERVAL: int = 24 * 60 * 60
+NO_RELEASES_POLL_INTERVAL: int = 12 * 60 * 60
+POLL_FRACTION: float = 1 / 48  # poll a repo that releases daily every half an hour
+CADENCE_SMOOTHING: float = 0.5
+POLL_BUDGET_PER_HOUR: int = 6000  # repo lookups, mind that these are batched
+TICK_MINUTES: int = 5
+WHEEL_SLOTS: int = 30  # 10 second slots
+POLL_CONCURRENCY: int = 3
+RESERVED_GRAPHQL_BUDGET: int = 500  # left for commands, the worker waits for a reset below this
+
+
+def parse_timestamp(timestamp: Optional[str]) -> Optional[datetime.datetime]:
+    return datetime.datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%SZ') if timestamp else None
+
+
+def learn_schedule(sub: dict, res: Optional[dict], now: datetime.datetime) -> dict:
+    """
+    Update a subscription's release cadence with a poll result and pick its next poll time
+
+    :param sub: The subscription document
+    :param res: The result of get_latest_release
+    :param now: The time of the poll
+    :return: The schedule fields to store in the subscription
+    """
+
+    cadence: Optional[float] = sub.get('cadence')
+    released_at: Optional[datetime.datetime] = sub.get('released_at')
+    if res and res['release']:
+        new: Optional[datetime.datetime] = parse_timestamp(res['release']['publishedAt'] or res['release']['createdAt'])
+        if new and released_at and new > released_at:
+            sample: float = (new - released_at).total_seconds()
+            cadence = sample if cadence is None else CADENCE_SMOOTHING * sample + (1 - CADENCE_SMOOTHING) * cadence
+        released_at = new or released_at
+    if cadence is not None:
+        expected: Optional[float] = cadence
+    elif released_at is not None:  # no history yet, the age of the latest release is the best guess we have
+        expected: Optional[float] = (now - released_at).total_seconds()
+    else:
+        expected = None
+    interval: float = NO_RELEASES_POLL_INTERVAL if expected is None else min(max(expected * POLL_FRACTION,
+                                                                                  MIN_POLL_INTERVAL),
+                                                                              MAX_POLL_INTERVAL)
+    return {'next_poll_at': now + datetime.timedelta(seconds=interval), 'released_at': released_at, 'cadence': cadence}
 
 
 class ReleaseFeed(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot: commands.Bot = bot
+        self.wheel: TimingWheel = TimingWheel(WHEEL_SLOTS, key=lambda sub: sub['_id'])
+        self.concurrency: asyncio.Semaphore = asyncio.Semaphore(POLL_CONCURRENCY)
+        self.deliveries: WebhookQueue = WebhookQueue(Git.ses, self.bot, self.drop_guild)
+        self.cycle_lag: float = 0  # seconds the last tick ran past its window
+        self.schedule_lag: float = 0  # seconds the most overdue repo of the last tick was past its poll time
         self.release_feed_worker.start()
 
-    @tasks.loop(minutes=45)
+    @tasks.loop(minutes=TICK_MINUTES)
     async def release_feed_worker(self) -> None:
-        async for doc in Mgr.db.guilds.find({}):
-            changed: bool = False
-            update: list = []
-            for item in doc['feed']:
-                res: Optional[dict] = await Git.get_latest_release(item['repo'])
-                if res:
-                    if res['release']:
-                        if (t := res['release']['tagName']) != item['release']:
-                            await self.handle_feed_item(doc, item, res)
-                            changed: bool = True
-                        update.append((item['repo'], t))
-                else:
-                    await self.handle_missing_item(doc, item)
-                await asyncio.sleep(2)
-            if changed:
-                await self.update_with_data(doc['_id'], update)
-
-    async def handle_feed_item(self, doc: dict, item: dict, new_release: dict) -> None:
+        start: float = time.monotonic()
+        window: float = TICK_MINUTES * 60
+        subscriptions: List[dict] = await Mgr.db.feed_subscriptions.due(
+            (now := datetime.datetime.utcnow()), POLL_BUDGET_PER_HOUR * TICK_MINUTES // 60).to_list(None)
+        self.schedule_lag = max([(now - s['next_poll_at']).total_seconds() for s in subscriptions
+                                 if s.get('next_poll_at')] + [0.])
+        polls: list = []
+        for i, slot in enumerate(self.wheel.distribute(subscriptions)):
+            if not slot:
+                continue
+            await asyncio.sleep(max(0., start + i * window / WHEEL_SLOTS - time.monotonic()))
+            await self.pace()
+            await self.concurrency.acquire()
+            polls.append(asyncio.ensure_future(self.poll_slot(slot)))
+        for result in await asyncio.gather(*polls, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error(f'Release worker slot failed: {result!r}')
+        self.cycle_lag = max(0., time.monotonic() - start - window)
+        if self.cycle_lag:
+            logger.warning(f'Release worker fell behind by {self.cycle_lag:.0f}s polling {len(subscriptions)} repos')
+
+    async def pace(self) -> None:
+        remaining, reset = Git.tokens.budget('graphql')
+        if remaining < RESERVED_GRAPHQL_BUDGET:
+            logger.info(f'Release worker waiting {reset - time.time():.0f}s for the GraphQL rate limit to reset')
+            await asyncio.sleep(max(0., reset - time.time()))
+
+    async def poll_slot(self, subscriptions: List[dict]) -> None:
+        try:
+            now: datetime.datetime = datetime.datetime.utcnow()
+            releases: Dict[str, Optional[dict]] = await Git.get_latest_releases(s['_id'] for s in subscriptions)
+            for sub in subscriptions:
+                await self.handle_subscription(sub, releases, now)
+        finally:
+            self.concurrency.release()
+
+    async def handle_subscription(self, sub: dict, releases: Dict[str, Optional[dict]], now: datetime.datetime) -> None:
+        if (repo := sub['_id']) not in releases:
+            return
+        if (res := releases[repo]) is None:
+            async for doc in Mgr.db.guilds.find({'_id': {'$in': sub['guilds']}}, {'hook': 1}):
+                await self.handle_missing_item(doc, repo)
+            return
+        tag: Optional[str] = res['release']['tagName'] if res['release'] else None
+        if tag is not None and tag != sub['release']:
+            embed: discord.Embed = self.build_release_embed(res)
+            async for doc in Mgr.db.guilds.find({'_id': {'$in': sub['guilds']}}, {'hook': 1, 'feed': 1}):
+                # guilds that subscribed after the last poll could've been sent this release already
+                if not any(item['repo'].lower() == repo and item.get('release') == tag for item in doc.get('feed', [])):
+                    self.doc_send(doc, embed)
+            await self.update_with_data(sub['guilds'], repo, tag)
+        await Mgr.db.feed_subscriptions.mark_polled(repo, tag if tag is not None else sub['release'],
+                                                    **learn_schedule(sub, res, now))
+
+    def build_release_embed(self, new_release: dict) -> discord.Embed:
         stage: str = 'prerelease' if new_release['release']['isPrerelease'] else 'release'
         if new_release['release']['isDraft']:
             stage += ' draft'
         embed: discord.Embed = discord.Embed(
             color=new_release['color'],
-            title=f'New {item["repo"]} {stage}! `{new_release["release"]["tagName"]}`',
+            title=f'New {new_release["url"][19:]} {stage}! `{new_release["release"]["tagName"]}`',
             url=new_release['release']['url']
         )
         if new_release['usesCustomOpenGraphImage']:
@@ -60,40 +152,52 @@ class ReleaseFeed(commands.Cog):
         embed.add_field(name=':notepad_spiral: Body:', value=body, inline=False)
         embed.add_field(name=':mag_right: Info:', value=info)
 
-        await self.doc_send(doc, embed)
+        return embed
 
-    async def update_with_data(self, guild_id: int, to_update: List[Tuple[str]]) -> None:
-        await Mgr.db.guilds.find_one_and_update({'_id': guild_id}, {
-            '$set': {'feed': [dict(repo=repo, release=release) for repo, release in to_update]}})
+    async def update_with_data(self, guild_ids: List[int], repo: str, release: str) -> None:
+        await Mgr.db.guilds.update_many({'_id': {'$in': guild_ids}},
+                                        {'$set': {'feed.$[item].release': release}},
+                                        array_filters=[{'item.repo': repo_filter(repo)}])
 
-    async def handle_missing_item(self, doc: dict, item: dict) -> None:
+    async def handle_missing_item(self, doc: dict, repo: str) -> None:
         embed: discord.Embed = discord.Embed(
             color=0xda4353,
             title=f'One of your release feed repos was deleted/renamed!',
-            description=f'A repository previously saved as `{item["repo"]}` was **deleted or renamed** by the owner. '
+            description=f'A repository previously saved as `{repo}` was **deleted or renamed** by the owner. '
                         f'Please re-add it under the new name.'
         )
-        await Mgr.db.guilds.update_one(doc, {'$pull': {'feed': item}})
-        await self.doc_send(doc, embed)
+        await Mgr.db.guilds.update_one({'_id': doc['_id']}, {'$pull': {'feed': {'repo': repo_filter(repo)}}})
+        await Mgr.db.feed_subscriptions.unsubscribe(repo, doc['_id'])
+        self.doc_send(doc, embed)
 
     @release_feed_worker.before_loop
     async def release_feed_worker_before_loop(self) -> None:
         logger.info('Release worker sleeping until the bot is ready...')
+        await Mgr.db.feed_subscriptions.ensure_indexes()
         await self.bot.wait_until_ready()
 
+    @commands.Cog.listener()
+    async def on_github_release(self, repo: str) -> None:
+        if (sub := await Mgr.db.feed_subscriptions.find_one({'_id': repo})) is not None:
+            # unlike get_latest_release, only gives None for repos GitHub reports as missing, not for any query error
+            await self.handle_subscription(sub, await Git.get_latest_releases([repo]), datetime.datetime.utcnow())
+
+    @commands.Cog.listener()
+    async def on_github_repository_gone(self, repo: str) -> None:
+        if (sub := await Mgr.db.feed_subscriptions.find_one({'_id': repo})) is not None:
+            await self.handle_subscription(sub, {repo: None}, datetime.datetime.utcnow())
+
     @commands.Cog.listener()
     async def on_guild_remove(self, guild: discord.Guild) -> None:
         await Mgr.db.guilds.find_one_and_delete({'_id': guild.id})
+        await Mgr.db.feed_subscriptions.unsubscribe_guild(guild.id)
 
-    async def doc_send(self, doc: dict, embed: discord.Embed) -> bool:
-        try:
-            webhook: discord.Webhook = discord.Webhook.from_url('https://discord.com/api/webhooks/' + doc['hook'],
-                                                                adapter=discord.AsyncWebhookAdapter(Git.ses))
-            await webhook.send(embed=embed, username=self.bot.user.name, avatar_url=self.bot.user.avatar_url)
-        except (discord.errors.NotFound, discord.errors.Forbidden, discord.errors.HTTPException):
-            await Mgr.db.guilds.find_one_and_delete({'_id': doc['_id']})
-            return False
-        return True
+    def doc_send(self, doc: dict, embed: discord.Embed) -> None:
+        self.deliveries.put(doc['hook'], doc['_id'], embed)
+
+    async def drop_guild(self, guild_id: int) -> None:
+        await Mgr.db.guilds.update_one({'_id': guild_id}, {'$unset': {'hook': '', 'feed': ''}})
+        await Mgr.db.feed_subscriptions.unsubscribe_guild(guild_id)
 
 
 def setup(bot: commands.Bot) -> None:
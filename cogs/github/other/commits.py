@@ -1,6 +1,9 @@
+import os
 import discord
+from typing import Optional
 from discord.ext import commands
 from core.globs import Mgr, Git
+from core.net.github.webhooks import COMMIT_FEED_PATH
 
 
 class Commits(commands.Cog):
@@ -14,30 +17,42 @@ class Commits(commands.Cog):
     @commands.guild_only()
     async def commits_command(self, ctx: commands.Context) -> None:
         ctx.fmt.set_prefix('commits')
+        base_url: Optional[str] = os.getenv('GITHUB_WEBHOOK_URL')  # without a receiver, GitHub posts to Discord directly
         try:
             webhook: discord.Webhook = await ctx.channel.create_webhook(name='GitHub Commits',
                                                                         reason=f'GitHub Commits setup by {ctx.author}')
         except discord.errors.HTTPException:
             await ctx.err(ctx.l.commits.webhook_failed)
             return
+        feed: Optional[dict] = None
+        if base_url:
+            feed = await Mgr.db.commit_feeds.create(ctx.guild.id, ctx.channel.id, webhook.url[33:])
+        instructions: list = ctx.l.commits.instructions if feed else ctx.l.commits.legacy_instructions
         embed: discord.Embed = discord.Embed(
             color=0x4287f5,
             title=f'{Mgr.e.github}  Commit Feed',
             description=(ctx.l.commits.description
                          + '\n'
-                         + '\n'.join([f'{Mgr.e.square} {instruction}' for instruction in ctx.l.commits.instructions])
+                         + '\n'.join([f'{Mgr.e.square} {instruction}' for instruction in instructions])
                          + '\n' + ':warning: ' + ctx.l.commits.do_not_share_warning + ' :warning:')
         )
         embed.set_footer(text=ctx.l.commits.footer)
+        if feed:
+            dm: str = (f'||{base_url.rstrip("/") + COMMIT_FEED_PATH + feed["_id"]}||\n'
+                       f'**{ctx.l.commits.dm_secret}:** ||`{feed["secret"]}`||')
+        else:
+            dm: str = f'||{webhook.url + "/github"}||'
         try:
             url_embed: discord.Embed = discord.Embed(
                 color=0x4287f5,
                 title=f'{Mgr.e.github} {ctx.l.commits.dm_title}',
-                description=f'||{webhook.url + "/github"}||'
+                description=dm
             )
             await ctx.author.send(embed=url_embed)
         except discord.errors.HTTPException:
             await ctx.err(ctx.l.commits.dm_failed)
+            if feed:
+                await Mgr.db.commit_feeds.remove(feed['_id'])
             try:
                 await webhook.delete(reason=f'GitHub Commits setup by {ctx.author} failed')
             except discord.errors.HTTPException:
@@ -1,8 +1,44 @@
 import re
-from typing import Union
-from aiohttp import ClientSession
+from typing import Union, Optional, List, Tuple
+from aiohttp import ClientSession, ClientResponse
 from discord.ext import commands
 from ext import regex
+from ext.structs import TTLCache
+
+MAX_LINES: int = 25
+READ_CHUNK_BYTES: int = 16 * 1024
+MAX_READ_BYTES: int = 2 * (1024 ** 2)  # stop reading files whose requested lines are further in than this
+CONTENT_CACHE_MAX_BYTES: int = 32 * (1024 ** 2)
+BRANCH_CONTENT_TTL: int = 60  # content at a commit SHA never changes, so only branches and tags expire
+
+
+async def read_lines(res: ClientResponse, end: int, max_bytes: int = MAX_READ_BYTES) -> Optional[Tuple[List[str], bool]]:
+    """
+    Read a response body line by line up to a certain line without downloading more of it than necessary
+
+    :param res: The response to read from
+    :param end: The last line to read, 1-indexed
+    :param max_bytes: The amount of bytes to give up after
+    :return: A tuple of the lines read without their line endings and whether the whole body was read,
+             None if max_bytes was read before reaching the last line
+    """
+
+    lines: List[str] = []
+    buffer: bytes = b''
+    read: int = 0
+    async for chunk in res.content.iter_chunked(READ_CHUNK_BYTES):
+        if (read := read + len(chunk)) > max_bytes:
+            res.close()
+            return None
+        *complete, buffer = (buffer + chunk).split(b'\n')
+        for line in complete:
+            lines.append(line.decode('utf-8', 'replace').rstrip('\r'))
+            if len(lines) == end:
+                res.close()  # the rest of the file is of no use, drop the connection instead of draining it
+                return lines, False
+    if buffer:
+        lines.append(buffer.decode('utf-8', 'replace').rstrip('\r'))
+    return lines, True
 
 
 async def compile_github_link(data: tuple) -> str:
@@ -17,41 +53,44 @@ class Lines(commands.Cog):
     def __init__(self, bot):
         self.bot: commands.Bot = bot
         self.ses: ClientSession = ClientSession(loop=self.bot.loop)
+        self.content_cache: TTLCache = TTLCache(CONTENT_CACHE_MAX_BYTES)
 
     def get_error(self, ctx: commands.Context, code: int) -> str:
         return {
             0: ctx.l.lines.more_than_25,
             1: ctx.l.lines.no_content,
             2: ctx.l.lines.private_or_inaccessible,
-            3: ctx.l.lines.nonexistent}[code]
-
-    async def compile_text(self, url: str, data: tuple) -> Union[str, int]:
-        if data[4]:
-            if abs(int(data[3]) - int(data[4])) > 25:
-                return 0
-
-        res = await self.ses.get(url)
-        content: str = await res.text(encoding='utf-8')
-
-        if res.status == 404 or '<title>Checking your Browser - GitLab</title>' in content:
-            return 3
-
-        lines_: list = content.splitlines(keepends=True)
-
-        if not data[4] and lines_[int(data[3]) - 1] == '\n':  # if the request is a single, empty line
+            3: ctx.l.lines.nonexistent,
+            4: ctx.l.lines.too_far}[code]
+
+    async def compile_text(self, url: str, data: tuple, type_: str = 'github') -> Union[str, int]:
+        start: int = int(data[3])
+        end: int = int(data[4]) if data[4] else start
+        if abs(end - start) > MAX_LINES:
+            return 0
+        start, end = min(start, end), max(start, end)
+
+        key: tuple = (type_, data[0].lower(), data[1], data[2])
+        content: Optional[Tuple[List[str], bool]] = self.content_cache.get(key)[0]
+        if content is None or (not content[1] and len(content[0]) < end):
+            async with self.ses.get(url) as res:
+                if res.status == 404 or res.content_type == 'text/html':  # GitLab's browser check is served as HTML
+                    return 3
+                if res.status != 200:  # rate limits and server errors are transient, never cache them
+                    return 2
+                if (content := await read_lines(res, end)) is None:
+                    return 4
+            self.content_cache.set(key, content,
+                                   float('inf') if regex.COMMIT_SHA_RE.match(data[1]) else BRANCH_CONTENT_TTL)
+
+        lines: List[str] = content[0][start - 1:end]
+        if not lines or (not data[4] and not lines[0]):  # if the request is a single, empty line
             return 1
 
         extension: str = url[url.rindex('.') + 1:]
         extension: str = 'js' if extension == 'ts' else extension
 
-        lines: list = []
-        for line in lines_[int(data[3]) - 1:int(data[4]) if data[4] != '' else int(data[3])]:
-            if line == '\r\n' or line.endswith('\n'):
-                lines.append(line)
-                continue
-            lines.append(f"{line}\n")
-
-        text: str = ''.join(lines)
+        text: str = ''.join(f'{line}\n' for line in lines)
         result: str = f"```{extension}\n{text}\n```"
 
         return result
@@ -59,30 +98,38 @@ class Lines(commands.Cog):
     @commands.command(name='--lines', aliases=['-lines', 'lines', 'line', '-line', '--line', '-l'])
     @commands.cooldown(15, 30, commands.BucketType.member)
     async def lines_command(self, ctx: commands.Context, link: str) -> None:
-        github_match: list = re.findall(regex.GITHUB_LINES_RE, link)
-        gitlab_match: list = re.findall(regex.GITLAB_LINES_RE, link)
-        if github_match:
-            result: str = await self.handle_match(github_match[0])
-            platform_term: str = ctx.l.glossary.github_repo_term
-        elif gitlab_match:
-            result: str = await self.handle_match(gitlab_match[0], 'gitlab')
-            platform_term: str = ctx.l.glossary.gitlab_repo_term
-        else:
+        if (resolved := await self.get_lines(link)) is None:
             await ctx.err(ctx.l.lines.no_lines_mentioned)
             return
+        result, type_ = resolved
+        platform_term: str = ctx.l.glossary.github_repo_term if type_ == 'github' else ctx.l.glossary.gitlab_repo_term
 
         if isinstance(result, str):
             await ctx.send(result)
         elif isinstance(result, int):
             await ctx.err(self.get_error(ctx, result).format(platform_term))
 
+    async def get_lines(self, link: str) -> Optional[Tuple[Union[str, int], str]]:
+        """
+        Get the lines a GitHub or GitLab link points to
+
+        :param link: The link
+        :return: A tuple of the code block or the error code and the platform of the link, None if it's not a lines link
+        """
+
+        if github_match := re.findall(regex.GITHUB_LINES_RE, link):
+            return await self.handle_match(github_match[0]), 'github'
+        if gitlab_match := re.findall(regex.GITLAB_LINES_RE, link):
+            return await self.handle_match(gitlab_match[0], 'gitlab'), 'gitlab'
+        return None
+
     async def handle_match(self, match: tuple, type_: str = 'github') -> str:
         if type_ == 'github':
             url: str = await compile_github_link(match)
         else:
             url: str = await compile_gitlab_link(match)
 
-        return await self.compile_text(url, match)
+        return await self.compile_text(url, match, type_)
 
 
 def setup(bot):
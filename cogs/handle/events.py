@@ -1,6 +1,12 @@
 import discord
 from discord.ext import commands
 from core.globs import Mgr
+from typing import Union, List
+from ext.structs import GitCommandData
+
+UNFURL_RATE: int = 3  # messages with previews per channel every UNFURL_PER seconds
+UNFURL_PER: int = 30
+UNFURL_MAX_LINKS: int = 3
 
 
 async def guild_text_channels(guild: discord.Guild):
@@ -11,6 +17,8 @@ async def guild_text_channels(guild: discord.Guild):
 class Events(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot: commands.Bot = bot
+        self.unfurl_cooldown: commands.CooldownMapping = commands.CooldownMapping.from_cooldown(
+            UNFURL_RATE, UNFURL_PER, commands.BucketType.channel)
 
     async def build_guild_embed(self, guild: discord.Guild, state: bool = True) -> discord.Embed:
         if state:
@@ -70,17 +78,46 @@ class Events(commands.Cog):
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
-        can_send: bool = await Mgr.verify_send_perms(message.channel)
-        locale = await Mgr.get_locale(message.author.id)
-        if all([self.bot.user in message.mentions[:1], len(message.content) < 23, can_send]):
+        if self.bot.user in message.mentions[:1] and len(message.content) < 23 \
+                and await Mgr.verify_send_perms(message.channel):
             embed = discord.Embed(
                 color=0xefefef,
-                description=locale.events.mention
+                description=(await Mgr.get_locale(message.author.id)).events.mention
             )
             embed.set_thumbnail(url=self.bot.user.avatar_url)
             embed.set_author(icon_url=self.bot.user.avatar_url, name=self.bot.user.name)
             await message.channel.send(embed=embed)
 
+    @commands.Cog.listener('on_message')
+    async def unfurl_links(self, message: discord.Message) -> None:
+        # substring checks first - this runs for every message, most of which don't contain a link at all
+        if 'github.com' not in (content := message.content) and 'gitlab.com' not in content:
+            return
+        if message.author.bot or message.guild is None or content.lower().startswith(self.bot.command_prefix.lower()):
+            return
+        if not await Mgr.get_unfurl(message.guild.id) or self.unfurl_cooldown.update_rate_limit(message):
+            return
+        refs: List[Union[tuple, str, GitCommandData]] = await Mgr.get_link_references(content,
+                                                                                      exclude=('user_org',),
+                                                                                      limit=UNFURL_MAX_LINKS)
+        if not (refs := [ref for ref in refs if isinstance(ref, GitCommandData)]):
+            return
+        ctx: commands.Context = await self.bot.get_context(message)
+        if not await self.bot.can_run(ctx) or not await Mgr.verify_send_perms(message.channel):
+            return
+        for ref in refs:
+            if ref.type == 'lines':  # the command would reply with its errors, unfurls fail silently instead
+                if (lines := self.bot.get_cog('Lines')) is not None \
+                        and (resolved := await lines.get_lines(ref.args)) is not None and isinstance(resolved[0], str):
+                    await ctx.send(resolved[0])
+                continue
+            setattr(ctx, 'data', ref.data)
+            cmd: commands.Command = self.bot.get_command(ref.type)
+            if isinstance(args := ref.args, (tuple, list)):
+                await ctx.invoke(cmd, *args)
+            else:
+                await ctx.invoke(cmd, args)
+
 
 def setup(bot: commands.Bot):
     bot.add_cog(Events(bot))
@@ -0,0 +1,99 @@
+import os
+import discord
+from bot import logger
+from discord.ext import commands
+from typing import Optional, List
+from core.globs import Git, Mgr
+from core.net.discord.webhooks import WebhookQueue
+from core.net.github.webhooks import WebhookReceiver, COMMIT_FEED_PATH
+
+MAX_COMMITS_PER_EMBED: int = 5
+
+
+def build_push_embed(payload: dict) -> Optional[discord.Embed]:
+    if payload.get('deleted') or not (commits := payload.get('commits')):
+        return None
+    lines: List[str] = []
+    for commit in commits[:MAX_COMMITS_PER_EMBED]:
+        summary: str = commit['message'].partition('\n')[0][:72]
+        author: str = commit['author'].get('username') or commit['author']['name']
+        lines.append(f'[`{commit["id"][:7]}`]({commit["url"]}) {summary} - {author}')
+    if len(commits) > MAX_COMMITS_PER_EMBED:
+        lines.append(f'...and {len(commits) - MAX_COMMITS_PER_EMBED} more')
+    branch: str = payload['ref'].split('/', 2)[-1]
+    title: str = f'[{payload["repository"]["full_name"]}:{branch}] {len(commits)} new commit'
+    embed: discord.Embed = discord.Embed(
+        color=0x4287f5,
+        title=(title if len(commits) == 1 else title + 's')[:256],
+        url=payload['compare'],
+        description='\n'.join(lines)
+    )
+    if sender := payload.get('sender'):
+        embed.set_author(name=sender['login'], url=sender['html_url'], icon_url=sender['avatar_url'])
+    return embed
+
+
+# Receives GitHub webhooks (content type application/json) of repos that have one pointed at the bot.
+# Events invalidate the API caches of their repo right away and are re-dispatched as bot events.
+# Repos whose hook delivers release events are taken off the release feed's polling schedule for as long as it keeps
+# delivering, a hook that goes quiet for FeedSubscriptionCollection's HOOK_TRUST_PERIOD is polled again.
+# Commit feeds set up with the commits command are received on their own token routes, signed with their own secrets,
+# and only ever forward pushes to their channel - anyone can set one up and sign payloads for any repo with its secret,
+# so they're trusted with neither feed state nor cache invalidation.
+class GitHubWebhooks(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot: commands.Bot = bot
+        self.receiver: Optional[WebhookReceiver] = None
+        self.deliveries: WebhookQueue = WebhookQueue(Git.ses, self.bot, Mgr.db.commit_feeds.remove)
+        secret: Optional[str] = os.getenv('GITHUB_WEBHOOK_SECRET')
+        if secret or os.getenv('GITHUB_WEBHOOK_URL'):
+            self.receiver = WebhookReceiver(secret, self.handle_event,
+                                            port=int(os.getenv('GITHUB_WEBHOOK_PORT', 8080)))
+            if os.getenv('GITHUB_WEBHOOK_URL'):
+                self.bot.loop.create_task(Mgr.db.commit_feeds.ensure_indexes())
+                self.receiver.add_token_route(COMMIT_FEED_PATH + '{token}', Mgr.db.commit_feeds.get_cached,
+                                              self.handle_commit_feed_event)
+            self.bot.loop.create_task(self.receiver.start())
+
+    def cog_unload(self) -> None:
+        if self.receiver is not None:
+            self.bot.loop.create_task(self.receiver.stop())
+
+    async def handle_event(self, event: str, payload: dict) -> None:
+        if not (repo := payload.get('repository', {}).get('full_name')):
+            return
+        repo: str = repo.lower()
+        Git.invalidate(repo)
+        action: Optional[str] = payload.get('action')
+        if event == 'meta':  # only sent when the hook is deleted
+            await Mgr.db.feed_subscriptions.unhook(repo)
+        elif event == 'release' or (event == 'ping' and {'release', '*'} & set(payload.get('hook', {}).get('events', []))):
+            await Mgr.db.feed_subscriptions.mark_hooked(repo)
+        else:  # proves that the hook still delivers, but not that it delivers releases
+            await Mgr.db.feed_subscriptions.mark_hooked(repo, only_if_hooked=True)
+        if event == 'release' and action in ('published', 'prereleased', 'released'):
+            self.bot.dispatch('github_release', repo)
+        elif event == 'repository' and action in ('deleted', 'renamed', 'transferred'):
+            changes: dict = payload.get('changes', {})
+            if action == 'renamed':
+                repo: str = f'{repo.split("/")[0]}/{changes["repository"]["name"]["from"]}'.lower()
+            elif action == 'transferred':
+                owner: dict = changes['owner']['from'].get('user') or changes['owner']['from'].get('organization')
+                repo: str = f'{owner["login"]}/{repo.split("/")[1]}'.lower()
+            Git.invalidate(repo)
+            self.bot.dispatch('github_repository_gone', repo)
+        logger.debug(f'GitHub {event} event for {repo}')
+
+    async def handle_commit_feed_event(self, event: str, payload: dict, feed: dict) -> None:
+        if event != 'push' or not payload.get('repository', {}).get('full_name'):
+            return
+        if (embed := build_push_embed(payload)) is not None:
+            self.deliveries.put(feed['hook'], feed['_id'], embed)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        await Mgr.db.commit_feeds.remove_guild(guild.id)
+
+
+def setup(bot: commands.Bot) -> None:
+    bot.add_cog(GitHubWebhooks(bot))
@@ -2,6 +2,7 @@ import discord
 import os
 import statcord
 from bot import PRODUCTION
+from core.globs import Mgr
 from discord.ext import commands, tasks
 from random import randint
 from itertools import cycle
@@ -14,6 +15,9 @@ class MiscellaneousBackgroundTasks(commands.Cog):
         if PRODUCTION:
             self.statcord: statcord.Client = statcord.Client(self.bot, os.getenv('STATCORD'))
             self.statcord.start_loop()
+        if bool(int(os.getenv('DB_CHANGE_STREAMS', 0))):  # keeps the settings caches of multiple processes coherent
+            for collection in (Mgr.db.users, Mgr.db.guilds):
+                self.bot.loop.create_task(collection.watch_invalidations())
 
     @tasks.loop(minutes=randint(2, 5))
     async def status_changer(self):
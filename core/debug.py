@@ -64,8 +64,57 @@ class Debug(commands.Cog):
         embed.add_field(name='Search',
                         value=f"{used_search}/{data[1] * 30}\n\
                         `{dt.datetime.fromtimestamp(search[0]['reset']).strftime('%X')}`")
+        embed.add_field(name='Token pool',
+                        value='\n'.join(f"`{t}` {Mgr.e.err if s['quarantined'] else Mgr.e.checkmark} "
+                                         f"core `{s.get('core', '-')}` graphql `{s.get('graphql', '-')}`"
+                                         for t, s in Git.tokens.stats.items()),
+                        inline=False)
         await ctx.send(embed=embed)
 
+    @dev_only()
+    @commands.command(name='cache', aliases=['--cache'])
+    async def cache_stats(self, ctx: commands.Context) -> None:
+        stats: dict = Git.cache.stats
+        lookups: int = stats['hits'] + stats['stale_hits'] + stats['misses']
+        embed = discord.Embed(
+            color=0xefefef,
+            title=f'{Mgr.e.github}  API cache'
+        )
+        embed.add_field(name='Lookups',
+                        value=f"Hits: `{stats['hits']}`\nStale: `{stats['stale_hits']}`\nMisses: `{stats['misses']}`\n"
+                              f"Hit rate: `{(stats['hits'] + stats['stale_hits']) / lookups if lookups else 0:.1%}`\n"
+                              f"Coalesced: `{Git.coalesced}`")
+        embed.add_field(name='Storage',
+                        value=f"Entries: `{stats['entries']}`\nEvictions: `{stats['evictions']}`\n"
+                              f"Size: `{stats['size'] / 1024 ** 2:.2f}/{stats['max_size'] / 1024 ** 2:.0f}mb`")
+        embed.add_field(name='Conditional',
+                        value=f"Sent: `{Git.gh.conditional_requests}`\nServed by 304: `{Git.gh.not_modified}`\n"
+                              f"Stored: `{len(Git.conditional_store)}`")
+        embed.add_field(name='Zipballs',
+                        value=f"Hits: `{Git.zipballs.hits}`\nMisses: `{Git.zipballs.misses}`\n"
+                              f"Shared: `{Git.zipballs.shared}`\nWaiting: `{Git.zipballs.waiting}`\n"
+                              f"Size: `{Git.zipballs.size / 1024 ** 2:.2f}/{Git.zipballs.max_bytes / 1024 ** 2:.0f}mb`")
+        await ctx.send(embed=embed)
+
+    @dev_only()
+    @commands.command(name='feedstats', aliases=['--feedstats'])
+    async def feed_stats(self, ctx: commands.Context) -> None:
+        feed = self.bot.get_cog('ReleaseFeed')
+        subscriptions: int = await Mgr.db.feed_subscriptions.count_documents({})
+        await ctx.send(f'{Mgr.e.github}  Following `{subscriptions}` repos\n'
+                       f'Cycle lag: `{feed.cycle_lag:.0f}s` Schedule lag: `{feed.schedule_lag:.0f}s`\n'
+                       f'Webhook executions: `{feed.deliveries.executions}` Embeds delivered: `{feed.deliveries.delivered}` '
+                       f'Retries: `{feed.deliveries.retries}` Dropped: `{feed.deliveries.dropped}`')
+
+    @dev_only()
+    @commands.command(name='hotreload', aliases=['--hotreload', 'reload-data'])
+    async def hot_reload(self, ctx: commands.Context) -> None:
+        locales: list = Mgr.reload_locales()
+        queries: list = Git._queries.reload_changed()  # pylint: disable=protected-access
+        setattr(ctx, 'l', await Mgr.get_locale(ctx))
+        await ctx.send(f'{Mgr.e.github}  Reloaded locales: `{", ".join(locales) or "none"}` '
+                       f'queries: `{", ".join(queries) or "none"}`')
+
     @commands.command()
     @commands.is_owner()
     @dev_only()
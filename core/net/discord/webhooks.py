@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import aiohttp
+import discord
+from discord.ext import commands
+from typing import Dict, List, Callable, Awaitable, Any
+
+WEBHOOK_BASE_URL: str = 'https://discord.com/api/webhooks/'
+MAX_EMBEDS_PER_EXECUTE: int = 10
+BATCH_WINDOW_SECONDS: float = 2
+MAX_DELIVERY_ATTEMPTS: int = 5
+BACKOFF_BASE_SECONDS: float = 2
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class WebhookQueue:
+    """Per-webhook delivery queues, batching the embeds queued for the same webhook into as few executions as possible.
+
+    Rate limits are waited out according to ``Retry-After`` and transient failures are retried with exponential backoff.
+    Only definitive failures (404, 401) are reported to ``on_gone``, everything else just drops the batch.
+
+    Parameters
+    ----------
+    session: :class:`aiohttp.ClientSession`
+        The session to execute the webhooks with.
+    bot: :class:`commands.Bot`
+        The bot whose name and avatar to send the messages with.
+    on_gone: :class:`Callable[[:class:`Any`], :class:`Awaitable`]`
+        The coroutine function called with the owner of a webhook that no longer exists.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, bot: commands.Bot, on_gone: Callable[[Any], Awaitable]):
+        self.session: aiohttp.ClientSession = session
+        self.bot: commands.Bot = bot
+        self.on_gone: Callable[[Any], Awaitable] = on_gone
+        self.executions: int = 0
+        self.delivered: int = 0
+        self.retries: int = 0
+        self.dropped: int = 0
+        self._queues: Dict[str, List[discord.Embed]] = {}
+        self._owners: Dict[str, Any] = {}
+
+    def put(self, hook: str, owner: Any, embed: discord.Embed) -> None:
+        """
+        Queue an embed for delivery
+
+        :param hook: The webhook's "id/token" path
+        :param owner: The value on_gone is called with if the webhook is gone, usually the guild ID
+        :param embed: The embed to send
+        """
+
+        if hook in self._queues:
+            self._queues[hook].append(embed)
+            return
+        self._queues[hook] = [embed]
+        self._owners[hook] = owner
+        asyncio.ensure_future(self._drain(hook))
+
+    async def _drain(self, hook: str) -> None:
+        await asyncio.sleep(BATCH_WINDOW_SECONDS)  # let the rest of the cycle's embeds for this hook pile up
+        gone: bool = False
+        try:
+            while queue := self._queues[hook]:
+                batch: List[discord.Embed] = queue[:MAX_EMBEDS_PER_EXECUTE]
+                del queue[:MAX_EMBEDS_PER_EXECUTE]
+                if not await self._deliver(hook, batch):
+                    self.dropped += len(queue)
+                    gone = True
+                    break
+        finally:
+            del self._queues[hook]
+            owner: Any = self._owners.pop(hook)
+        if gone:
+            await self.on_gone(owner)
+
+    async def _deliver(self, hook: str, embeds: List[discord.Embed]) -> bool:
+        """
+        Execute a webhook with a batch of embeds
+
+        :param hook: The webhook's "id/token" path
+        :param embeds: The embeds to send
+        :return: False if the webhook is gone, True otherwise, even if the batch had to be dropped
+        """
+
+        webhook: discord.Webhook = discord.Webhook.from_url(WEBHOOK_BASE_URL + hook,
+                                                            adapter=discord.AsyncWebhookAdapter(self.session))
+        for attempt in range(MAX_DELIVERY_ATTEMPTS):
+            if attempt:
+                self.retries += 1
+            try:
+                self.executions += 1
+                await webhook.send(embeds=embeds, username=self.bot.user.name, avatar_url=self.bot.user.avatar_url)
+                self.delivered += len(embeds)
+                return True
+            except discord.NotFound:
+                break
+            except discord.HTTPException as e:
+                if e.status == 401:
+                    break
+                if e.status == 429:
+                    delay: float = float(e.response.headers.get('Retry-After', BACKOFF_BASE_SECONDS))
+                elif e.status >= 500:
+                    delay: float = BACKOFF_BASE_SECONDS * 2 ** attempt
+                else:  # a malformed request or missing permissions, retrying won't change a thing
+                    logger.warning(f'Dropping {len(embeds)} embeds for a webhook: {e.status} {e.text}')
+                    self.dropped += len(embeds)
+                    return True
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                delay: float = BACKOFF_BASE_SECONDS * 2 ** attempt
+            if attempt + 1 < MAX_DELIVERY_ATTEMPTS:
+                await asyncio.sleep(delay)
+        else:
+            logger.warning(f'Dropping {len(embeds)} embeds for a webhook after {MAX_DELIVERY_ATTEMPTS} attempts')
+            self.dropped += len(embeds)
+            return True
+        self.dropped += len(embeds)
+        return False
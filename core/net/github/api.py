@@ -1,16 +1,134 @@
+import os
 import aiohttp
 import asyncio
-import gidgethub.aiohttp as gh
+import functools
+import tempfile
 from sys import version_info
-from typing import Union, List, Optional
-from gidgethub import BadRequest, QueryError
-from datetime import date, datetime
-from itertools import cycle
-from ext.structs import DirProxy, GhProfileData
+from typing import Union, List, Optional, Callable, Any, Iterable, Dict, IO
+from gidgethub import BadRequest, QueryError, GitHubBroken
+from datetime import date, datetime, timedelta, time
+from ext.structs import DirProxy, GhProfileData, TTLCache, LRUDict
+from ext.structs.cache import FRESH, STALE
+from .client import GitHubClient
+from .tokens import TokenPool
+from .zipballs import ZipballStore
 
 YEAR_START: str = f'{date.today().year}-01-01T00:00:30Z'
 BASE_URL: str = 'https://api.github.com'
 SIZE_THRESHOLD_BYTES: int = int(7.85 * (1024 ** 2))  # 7.85mb
+ZIP_CHUNK_BYTES: int = 64 * 1024
+ZIP_SPOOL_MEMORY_BYTES: int = 1024 ** 2  # bigger archives are spooled to disk
+ZIPBALL_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), 'gitbot-zipballs')
+ZIPBALL_CACHE_MAX_BYTES: int = 512 * (1024 ** 2)  # 512mb
+MAX_CONCURRENT_ZIPBALL_DOWNLOADS: int = 10
+CACHE_MAX_BYTES: int = 64 * (1024 ** 2)  # 64mb
+CONDITIONAL_STORE_MAX_BYTES: int = 32 * (1024 ** 2)  # 32mb
+RELEASE_BATCH_SIZE: int = 50  # repositories per aliased GraphQL query
+SPLITTABLE_QUERY_ERRORS: tuple = ('MAX_NODE_LIMIT_EXCEEDED', 'RESOURCE_LIMITS_EXCEEDED')
+
+
+def _key_tags(key: tuple) -> tuple:
+    return (key[1],) if len(key) > 1 and isinstance(key[1], str) else ()  # the user, org or repo looked up
+
+
+def _url_tags(url: str) -> tuple:
+    parts: List[str] = url[len(BASE_URL):].partition('?')[0].lower().split('/') if url.startswith(BASE_URL) else []
+    if len(parts) > 3 and parts[1] == 'repos':
+        return f'{parts[2]}/{parts[3]}',
+    if len(parts) > 2 and parts[1] in ('users', 'orgs'):
+        return parts[2],
+    return ()
+
+
+def _daily(cap: int) -> Callable[[], float]:
+    def ttl() -> float:  # contribution counts roll over at midnight UTC
+        now: datetime = datetime.utcnow()
+        return min(cap, (datetime.combine(now.date() + timedelta(days=1), time.min) - now).total_seconds())
+
+    return ttl
+
+
+# resource: (TTL, stale-while-revalidate window) in seconds, the TTL can be a callable
+CACHE_POLICIES: dict = {
+    'user': (_daily(30 * 60), 5 * 60),
+    'org': (60 * 60, 6 * 60 * 60),
+    'user_orgs': (60 * 60, 6 * 60 * 60),
+    'org_members': (60 * 60, 6 * 60 * 60),
+    'user_repos': (10 * 60, 60 * 60),
+    'org_repos': (10 * 60, 60 * 60),
+    'repo': (10 * 60, 30 * 60),
+    'files': (5 * 60, 30 * 60),
+    'gists': (10 * 60, 30 * 60),
+    'gist': (10 * 60, 30 * 60),
+    'release': (5 * 60, 0),
+    'head': (60, 0),
+    'issue': (60, 2 * 60),
+    'pr': (60, 2 * 60)
+}
+
+
+def cached(resource: str,
+           key_args: int = 1,
+           errors: tuple = (),
+           fallback: Optional[Callable[[], Any]] = None) -> Callable:
+    """
+    Cache the results of a GitHubAPI method according to its resource's policy in CACHE_POLICIES.
+    Concurrent calls for the same key share a single in-flight request.
+    Calls passing more positional arguments than key_args, or any keyword arguments, bypass the cache.
+
+    :param resource: The resource type of the results
+    :param key_args: The amount of positional arguments identifying the resource
+    :param errors: The error codes the method returns, which are never cached (None never is either)
+    :param fallback: A function called for the value to return when the method raises BadRequest, in place of
+                     returning it from the method, so the failure isn't cached like a valid result would be
+    :return: The decorator
+    """
+
+    ttl, stale = CACHE_POLICIES[resource]
+
+    def decorator(func: Callable) -> Callable:
+        def flight(self: 'GitHubAPI', key: tuple, args: tuple) -> asyncio.Future:
+            def done(future: asyncio.Future) -> None:
+                del self._inflight[key]
+                if not future.cancelled() and future.exception() is None:
+                    if (result := future.result()) is not None and result not in errors:
+                        self.cache.set(key, result, ttl() if callable(ttl) else ttl, stale)
+
+            future: asyncio.Future = asyncio.ensure_future(func(self, *args))
+            future.add_done_callback(done)
+            self._inflight[key] = future
+            return future
+
+        @functools.wraps(func)
+        async def wrapper(self: 'GitHubAPI', *args, **kwargs) -> Any:
+            try:
+                return await lookup(self, *args, **kwargs)
+            except BadRequest:
+                if fallback is None:
+                    raise
+                return fallback()
+
+        async def lookup(self: 'GitHubAPI', *args, **kwargs) -> Any:
+            if kwargs or len(args) > key_args:
+                return await func(self, *args, **kwargs)
+            key: tuple = (func.__name__,) + tuple(a.strip().lower() if i == 0 and isinstance(a, str) else a
+                                                  for i, a in enumerate(args))
+            value, state = self.cache.get(key)
+            if state == FRESH:
+                return value
+            if state == STALE:
+                if key not in self._inflight:  # revalidate in the background, errors keep the stale copy around
+                    flight(self, key, args)
+                return value
+            if (future := self._inflight.get(key)) is not None:
+                self.coalesced += 1
+            else:
+                future: asyncio.Future = flight(self, key, args)
+            return await asyncio.shield(future)  # a cancelled awaiter mustn't cancel the request for the others
+
+        return wrapper
+
+    return decorator
 
 
 class GitHubAPI:
@@ -27,15 +145,35 @@ class GitHubAPI:
 
     def __init__(self, tokens: tuple, requester: str):
         requester: str = requester + '; Python {v.major}.{v.minor}.{v.micro}'.format(v=version_info)
-        self.__tokens: tuple = tokens
-        self._queries: DirProxy = DirProxy('./data/queries/', ('.gql', '.graphql'))
-        self.tokens: cycle = cycle(t for t in tokens if t is not None)
+        self._queries: DirProxy = DirProxy('./data/queries/', ('.gql', '.graphql'), lazy=True)
+        self.tokens: TokenPool = TokenPool(tokens)
+        self.cache: TTLCache = TTLCache(CACHE_MAX_BYTES, tags=_key_tags)
+        self.coalesced: int = 0
+        self._inflight: dict = {}
+        self.conditional_store: LRUDict = LRUDict(CONDITIONAL_STORE_MAX_BYTES, tags=_url_tags)
         self.ses: aiohttp.ClientSession = aiohttp.ClientSession()
-        self.gh: gh.GitHubAPI = gh.GitHubAPI(session=self.ses, requester=requester, oauth_token=self.token)
+        self.gh: GitHubClient = GitHubClient(session=self.ses, requester=requester, oauth_token=next(iter(self.tokens)),
+                                             cache=self.conditional_store, tokens=self.tokens)
+        self.zipballs: ZipballStore = ZipballStore(self, ZIPBALL_CACHE_DIR, ZIPBALL_CACHE_MAX_BYTES,
+                                                   MAX_CONCURRENT_ZIPBALL_DOWNLOADS)
 
     @property
     def token(self) -> str:
-        return next(self.tokens)
+        return self.tokens.acquire()
+
+    def invalidate(self, repo: str) -> int:
+        """
+        Drop everything cached about a repo and its owner, ex. after a webhook event
+
+        :param repo: The repo in the owner/name format
+        :return: The amount of entries removed
+        """
+
+        repo: str = repo.strip().lower()
+        removed: int = 0
+        for target in (repo, repo.split('/')[0]):  # both stores are indexed by these, so this doesn't scan them
+            removed += self.cache.invalidate_tag(target) + self.conditional_store.delete_tag(target)
+        return removed
 
     async def ghprofile_stats(self, name: str) -> Union[GhProfileData, None]:
         if '/' in name or '&' in name:
@@ -48,61 +186,55 @@ class GitHubAPI:
 
     async def get_ratelimit(self) -> tuple:
         results: list = []
-        for token in self.__tokens:
+        for token in self.tokens:
             data = await (await self.ses.get(f'https://api.github.com/rate_limit',
                                              headers={'Authorization': f'token {token}'})).json()
+            if 'resources' in data:
+                self.tokens.sync(token, data['resources'])
             results.append(data)
-        return tuple(results), len(self.__tokens)
+        return tuple(results), len(self.tokens)
 
+    @cached('user_repos')
     async def get_user_repos(self, user: str) -> Optional[list]:
         try:
             return list([x for x in await self.gh.getitem(f"/users/{user}/repos") if x['private'] is False])
         except BadRequest:
             return None
 
+    @cached('org')
     async def get_org(self, org: str) -> Optional[dict]:
         try:
             return await self.gh.getitem(f"/orgs/{org}")
         except BadRequest:
             return None
 
+    @cached('org_repos', fallback=list)
     async def get_org_repos(self, org: str) -> Union[List[dict], list]:
-        try:
-            res = list([x for x in await self.gh.getitem(f"/orgs/{org}/repos") if x['private'] is False])
-            return res
-        except BadRequest:
-            return []
+        return list([x for x in await self.gh.getitem(f"/orgs/{org}/repos") if x['private'] is False])
 
+    @cached('files', fallback=list)
     async def get_repo_files(self, repo: str) -> Union[List[dict], list]:
         if '/' not in repo:
             return []
-        try:
-            return await self.gh.getitem(f"/repos/{repo}/contents")
-        except BadRequest:
-            return []
+        return await self.gh.getitem(f"/repos/{repo}/contents")
 
+    @cached('files', key_args=2, fallback=list)
     async def get_tree_file(self, repo: str, path: str):
         if '/' not in repo:
             return []
         if path[0] == '/':
             path = path[1:]
-        try:
-            return await self.gh.getitem(f"/repos/{repo}/contents/{path}")
-        except BadRequest:
-            return []
+        return await self.gh.getitem(f"/repos/{repo}/contents/{path}")
 
+    @cached('user_orgs', fallback=list)
     async def get_user_orgs(self, user: str) -> Union[List[dict], list]:
-        try:
-            return list(await self.gh.getitem(f"/users/{user}/orgs"))
-        except BadRequest:
-            return []
+        return list(await self.gh.getitem(f"/users/{user}/orgs"))
 
+    @cached('org_members', fallback=list)
     async def get_org_members(self, org: str) -> Union[List[dict], list]:
-        try:
-            return list(await self.gh.getitem(f"/orgs/{org}/members"))
-        except BadRequest:
-            return []
+        return list(await self.gh.getitem(f"/orgs/{org}/members"))
 
+    @cached('gists')
     async def get_user_gists(self, user: str):
         try:
             data = await self.gh.graphql(self._queries.user_gists, **{'Login': user})
@@ -111,39 +243,150 @@ class GitHubAPI:
 
         return data['user']
 
+    @cached('gist')
     async def get_gist(self, gist_id: str) -> Optional[dict]:
         try:
             return dict(await self.gh.getitem(f"/gists/{gist_id}"))
         except BadRequest:
             return None
 
-    async def get_repo_zip(self, repo: str) -> Optional[Union[bool, bytes]]:
-        res = await self.ses.get(BASE_URL + f"/repos/{repo}/zipball",
-                                 headers={"Authorization": f"token {self.token}"})
-        if res.status == 200:
-            try:
-                await res.content.readexactly(SIZE_THRESHOLD_BYTES)
-            except asyncio.IncompleteReadError as read:
-                return read.partial
-            else:
+    @cached('head')
+    async def get_head_sha(self, repo: str) -> Optional[str]:
+        if repo.count('/') != 1:
+            return None
+        try:
+            res: Union[str, dict] = await self.gh.getitem(f'/repos/{repo}/commits/HEAD',
+                                                          accept='application/vnd.github.sha')
+        except BadRequest:
+            return None
+        return res if isinstance(res, str) else res['sha']
+
+    async def get_repo_zip(self,
+                           repo: str,
+                           ref: Optional[str] = None,
+                           file: Optional[IO[bytes]] = None) -> Optional[Union[bool, IO[bytes]]]:
+        """
+        Stream a repo's zipball into a file, aborting as soon as it crosses SIZE_THRESHOLD_BYTES
+
+        :param repo: The repo to download
+        :param ref: The commit, branch or tag to download, the default branch if None
+        :param file: The file to write the archive to, if None, a temporary file is created and returned
+        :return: The temporary file rewound to the start or True if file was passed,
+                 False if the archive is too big, None if the repo doesn't exist
+        """
+
+        async with self.ses.get(BASE_URL + f"/repos/{repo}/zipball" + (f'/{ref}' if ref else ''),
+                                headers={"Authorization": f"token {(token := self.token)}"}) as res:
+            self.tokens.update(token, res.headers, res.status)
+            if res.status != 200:
+                return None
+            if res.content_length is not None and res.content_length > SIZE_THRESHOLD_BYTES:
                 return False
-        return None
-
+            fp: IO[bytes] = file if file is not None else tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MEMORY_BYTES)
+            size: int = 0
+            async for chunk in res.content.iter_chunked(ZIP_CHUNK_BYTES):
+                size += len(chunk)
+                if size > SIZE_THRESHOLD_BYTES:
+                    if file is None:
+                        fp.close()
+                    res.close()  # drop the connection instead of draining the rest of the archive
+                    return False
+                fp.write(chunk)
+        if file is not None:
+            return True
+        fp.seek(0)
+        return fp
+
+    @cached('release')
     async def get_latest_release(self, repo: str) -> Optional[dict]:
         owner, name = repo.split('/')
 
         try:
-            data: dict = await self.gh.graphql(self._queries.release, **{'Name': name, 'Owner': owner})
+            data: dict = await self.gh.graphql(self._queries.release + '\n' + self._queries.release_fields,
+                                               **{'Name': name, 'Owner': owner})
         except QueryError:
             return None
 
-        data = data['repository']
+        return self._parse_release(data['repository'])
+
+    async def get_latest_releases(self, repos: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        Get the latest releases of many repos, packing up to RELEASE_BATCH_SIZE repos into a single query
+
+        :param repos: The repos to get the latest releases of
+        :return: A mapping of the lowercase repo names to the results of get_latest_release, None only for repos
+                 GitHub reports as missing, repos that couldn't be looked up due to GitHub errors are left out
+        """
+
+        results: Dict[str, Optional[dict]] = {}
+        to_fetch: List[str] = []
+        for repo in dict.fromkeys(r.strip().lower() for r in repos):
+            if repo.count('/') != 1:
+                results[repo] = None
+                continue
+            value, state = self.cache.get(('get_latest_release', repo))
+            if state == FRESH:
+                results[repo] = value
+            else:
+                to_fetch.append(repo)
+        for i in range(0, len(to_fetch), RELEASE_BATCH_SIZE):
+            try:
+                results.update(await self._get_release_batch(to_fetch[i:i + RELEASE_BATCH_SIZE]))
+            except QueryError:  # rate limited, the remaining batches would fail all the same
+                break
+        return results
+
+    async def _get_release_batch(self, repos: List[str]) -> Dict[str, Optional[dict]]:
+        variables: dict = {}
+        for i, repo in enumerate(repos):
+            variables[f'Owner{i}'], variables[f'Name{i}'] = repo.split('/')
+        query: str = 'query({}) {{\n{}\n}}\n{}'.format(
+            ', '.join(f'$Owner{i}: String!, $Name{i}: String!' for i in range(len(repos))),
+            '\n'.join(f'  r{i}: repository(owner: $Owner{i}, name: $Name{i}) {{ ...ReleaseFields }}'
+                      for i in range(len(repos))),
+            self._queries.release_fields
+        )
+
+        errors: List[dict] = []
+        try:
+            data: Optional[dict] = await self.gh.graphql(query, **variables)
+        except QueryError as e:  # nonexistent repos come back as null alongside an error, the rest is still there
+            data: Optional[dict] = e.response.get('data')
+            errors: List[dict] = e.response.get('errors', [])
+            if any(err.get('type') == 'RATE_LIMITED' for err in errors):
+                raise
+            if any(err.get('type') in SPLITTABLE_QUERY_ERRORS for err in errors):
+                data = None
+            elif not data:  # ex. "Something went wrong while executing your query", splitting won't help
+                return {}
+        except GitHubBroken:  # usually a timeout of a query that's too expensive
+            data = None
+
+        if data is None:
+            if len(repos) == 1:
+                return {}
+            middle: int = len(repos) // 2
+            return {**await self._get_release_batch(repos[:middle]), **await self._get_release_batch(repos[middle:])}
+
+        missing: set = {err['path'][0] for err in errors if err.get('type') == 'NOT_FOUND' and err.get('path')}
+        results: Dict[str, Optional[dict]] = {}
+        ttl, stale = CACHE_POLICIES['release']
+        for i, repo in enumerate(repos):
+            if (repository := data.get(f'r{i}')) is not None:
+                results[repo] = self._parse_release(repository)
+                self.cache.set(('get_latest_release', repo), results[repo], ttl, stale)
+            elif f'r{i}' in missing:
+                results[repo] = None
+        return results
+
+    def _parse_release(self, data: dict) -> dict:
         data['release'] = data['releases']['nodes'][0] if data['releases']['nodes'] else None
         data['color'] = int(data['primaryLanguage']['color'][1:], 16) if data['primaryLanguage'] else 0xefefef
         del data['primaryLanguage']
         del data['releases']
         return data
 
+    @cached('repo')
     async def get_repo(self, repo: str) -> Optional[dict]:
         split: list = repo.split('/')
         owner: str = split[0]
@@ -161,6 +404,7 @@ class GitHubAPI:
         data['release'] = data['releases']['nodes'][0]['tagName'] if data['releases']['nodes'] else None
         return data
 
+    @cached('pr', key_args=2, errors=('repo', 'number'))
     async def get_pull_request(self,
                                repo: str,
                                number: int,
@@ -212,6 +456,7 @@ class GitHubAPI:
             return None
         return data['repository']['pullRequests']['nodes']
 
+    @cached('issue', key_args=2, errors=('repo', 'number'))
     async def get_issue(self,
                         repo: str,
                         number: int,
@@ -264,6 +509,7 @@ class GitHubAPI:
             return None
         return data['repository']['issues']['nodes']
 
+    @cached('user')
     async def get_user(self, user: str):
         try:
             data = await self.gh.graphql(self._queries.user, **{'Login': user,
@@ -0,0 +1,39 @@
+import gidgethub.aiohttp as gh
+from typing import Mapping, Tuple, Optional
+from .tokens import TokenPool, bucket_for
+
+
+class GitHubClient(gh.GitHubAPI):
+    """A subclass of gidgethub's aiohttp client keeping track of conditional request outcomes.
+
+    .. note::
+        The conditional requests themselves are handled by gidgethub when a ``cache`` mapping is passed -
+        ETags and Last-Modified dates are stored alongside the bodies and sent back with the next GET,
+        and a 304 response is answered from the stored body. 304s don't count against the rate limit.
+
+    Parameters
+    ----------
+    tokens: :class:`Optional[:class:`TokenPool`]`
+        The pool to pick the token of each request from, if None, the client's ``oauth_token`` is always used.
+    """
+
+    def __init__(self, *args, tokens: Optional[TokenPool] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tokens: Optional[TokenPool] = tokens
+        self.conditional_requests: int = 0
+        self.not_modified: int = 0
+
+    async def _request(self, method: str, url: str, headers: Mapping[str, str],
+                       body: bytes = b'') -> Tuple[int, Mapping[str, str], bytes]:
+        if 'if-none-match' in headers or 'if-modified-since' in headers:
+            self.conditional_requests += 1
+        if self.tokens is not None:
+            bucket: str = bucket_for(url)
+            token: str = self.tokens.acquire(bucket)
+            headers = {**headers, 'authorization': f'token {token}'}
+        status, headers_, body_ = await super()._request(method, url, headers, body)
+        if self.tokens is not None:
+            self.tokens.update(token, headers_, status, bucket)
+        if status == 304:
+            self.not_modified += 1
+        return status, headers_, body_
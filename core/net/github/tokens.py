@@ -0,0 +1,151 @@
+import time
+from typing import Iterable, Optional, Mapping, Dict, Tuple
+
+__all__: tuple = (
+    'TokenPool',
+    'bucket_for'
+)
+
+DEFAULT_LIMITS: dict = {'core': 5000, 'graphql': 5000, 'search': 30}
+REVOKED_QUARANTINE_SECONDS: int = 60 * 60
+
+
+def bucket_for(url: str) -> str:
+    """
+    Get the rate limit bucket a request URL is charged against
+
+    :param url: The request URL
+    :return: The name of the bucket
+    """
+
+    if url.endswith('/graphql'):
+        return 'graphql'
+    if '/search/' in url:
+        return 'search'
+    return 'core'
+
+
+class _Bucket:
+    __slots__: tuple = ('remaining', 'reset')
+
+    def __init__(self, remaining: int, reset: float = 0):
+        self.remaining: int = remaining
+        self.reset: float = reset
+
+
+class _TokenState:
+    __slots__: tuple = ('token', 'buckets', 'quarantined_until')
+
+    def __init__(self, token: str):
+        self.token: str = token
+        self.buckets: Dict[str, _Bucket] = {}
+        self.quarantined_until: float = 0
+
+    def bucket(self, name: str) -> _Bucket:
+        if name not in self.buckets:
+            self.buckets[name] = _Bucket(DEFAULT_LIMITS.get(name, DEFAULT_LIMITS['core']))
+        return self.buckets[name]
+
+    def budget(self, name: str, now: float) -> int:
+        if now < self.quarantined_until:
+            return -1
+        bucket: _Bucket = self.bucket(name)
+        if bucket.reset and now >= bucket.reset:  # the window has rolled over since we last heard from GitHub
+            bucket.remaining, bucket.reset = DEFAULT_LIMITS.get(name, DEFAULT_LIMITS['core']), 0
+        return bucket.remaining
+
+
+class TokenPool:
+    """A rate limit aware pool of GitHub access tokens.
+
+    Every request is sent with the token that has the most budget left in the request's bucket (core, graphql, search),
+    as reported by the ``X-RateLimit-*`` headers of its previous responses. Exhausted tokens sit out until their
+    bucket resets, and tokens GitHub rejects with a 401 are quarantined for an hour.
+
+    Parameters
+    ----------
+    tokens: :class:`Iterable[:class:`Optional[:class:`str`]`]`
+        The tokens to schedule, None values are skipped.
+    """
+
+    def __init__(self, tokens: Iterable[Optional[str]]):
+        self._states: Dict[str, _TokenState] = {t: _TokenState(t) for t in tokens if t is not None}
+        if not self._states:
+            raise ValueError('At least one GitHub token is required')
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __iter__(self):
+        yield from self._states
+
+    def acquire(self, bucket: str = 'core') -> str:
+        """
+        Pick the token with the most budget left in a bucket
+
+        :param bucket: The rate limit bucket the request will be charged against
+        :return: The token to send the request with
+        """
+
+        now: float = time.time()
+        state: _TokenState = max(self._states.values(), key=lambda s: s.budget(bucket, now))
+        if state.budget(bucket, now) <= 0:  # everything is exhausted, go with whatever frees up first
+            state = min(self._states.values(), key=lambda s: max(s.quarantined_until, s.bucket(bucket).reset))
+        state.bucket(bucket).remaining -= 1  # optimistic, so that concurrent requests spread across tokens
+        return state.token
+
+    def update(self, token: str, headers: Mapping[str, str], status: int, bucket: str = 'core') -> None:
+        """
+        Update a token's budget with the rate limit headers of a response
+
+        :param token: The token the request was sent with
+        :param headers: The response headers
+        :param status: The response status
+        :param bucket: The bucket to use if the response doesn't name one
+        """
+
+        if (state := self._states.get(token)) is None:
+            return
+        if status == 401:
+            state.quarantined_until = time.time() + REVOKED_QUARANTINE_SECONDS
+            return
+        if 'x-ratelimit-remaining' not in headers:
+            return
+        b: _Bucket = state.bucket(headers.get('x-ratelimit-resource', bucket))
+        b.remaining = int(headers['x-ratelimit-remaining'])
+        b.reset = float(headers.get('x-ratelimit-reset', b.reset))
+        if status == 403 and b.remaining == 0:
+            state.quarantined_until = b.reset
+
+    def sync(self, token: str, resources: Mapping[str, Mapping[str, int]]) -> None:
+        """
+        Update a token's budgets with the body of a /rate_limit response
+
+        :param token: The token the request was sent with
+        :param resources: The "resources" object of the response
+        """
+
+        if (state := self._states.get(token)) is None:
+            return
+        for name, data in resources.items():
+            b: _Bucket = state.bucket(name)
+            b.remaining, b.reset = int(data['remaining']), float(data['reset'])
+
+    def budget(self, bucket: str = 'core') -> Tuple[int, float]:
+        """
+        Get the combined budget of all usable tokens in a bucket
+
+        :param bucket: The rate limit bucket
+        :return: A tuple of the remaining requests and the timestamp of the earliest reset
+        """
+
+        now: float = time.time()
+        remaining: int = sum(max(s.budget(bucket, now), 0) for s in self._states.values())
+        resets: list = [r for s in self._states.values() if (r := max(s.quarantined_until, s.bucket(bucket).reset)) > now]
+        return remaining, min(resets, default=now)
+
+    @property
+    def stats(self) -> dict:
+        now: float = time.time()
+        return {f'#{i}': {'quarantined': now < s.quarantined_until, **{n: b.remaining for n, b in s.buckets.items()}}
+                for i, s in enumerate(self._states.values())}
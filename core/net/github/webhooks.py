@@ -0,0 +1,125 @@
+import hmac
+import json
+import hashlib
+import asyncio
+from aiohttp import web
+from collections import OrderedDict
+from typing import Callable, Awaitable, Optional
+
+ACCEPTED_EVENTS: tuple = ('ping', 'meta', 'release', 'push', 'repository')
+COMMIT_FEED_PATH: str = '/github/commits/'  # followed by the feed's token
+SEEN_DELIVERIES: int = 4096  # GitHub redelivers on timeouts, duplicates among this many last deliveries are dropped
+
+
+def verify_signature(secret: bytes, body: bytes, signature: Optional[str]) -> bool:
+    """
+    Check the X-Hub-Signature-256 header of a GitHub webhook delivery
+
+    :param secret: The webhook secret
+    :param body: The raw request body
+    :param signature: The value of the header
+    :return: Whether the delivery was signed with the secret
+    """
+
+    if not signature or not signature.startswith('sha256='):
+        return False
+    return hmac.compare_digest(signature[7:], hmac.new(secret, body, hashlib.sha256).hexdigest())
+
+
+class WebhookReceiver:
+    """An embedded HTTP server accepting HMAC-verified GitHub webhook deliveries.
+
+    Deliveries of the events in ACCEPTED_EVENTS are acknowledged right away and handed to ``handler``
+    in the background, everything else is acknowledged and ignored, as are redeliveries of a delivery.
+    Webhooks set up by users are received on token routes instead, see :meth:`add_token_route`.
+
+    Parameters
+    ----------
+    secret: :class:`Optional[:class:`str`]`
+        The secret the bot's own webhooks were configured with, None to only receive token routes.
+    handler: :class:`Optional[:class:`Callable[[:class:`str`, :class:`dict`], :class:`Awaitable`]`]`
+        The coroutine function called with the event name and the payload of each delivery.
+    host: :class:`str`
+        The interface to listen on.
+    port: :class:`int`
+        The port to listen on.
+    path: :class:`str`
+        The path deliveries are POSTed to.
+    """
+
+    def __init__(self,
+                 secret: Optional[str],
+                 handler: Optional[Callable[[str, dict], Awaitable]],
+                 host: str = '0.0.0.0',
+                 port: int = 8080,
+                 path: str = '/github'):
+        self.secret: Optional[bytes] = secret.encode() if secret else None
+        self.handler: Optional[Callable[[str, dict], Awaitable]] = handler
+        self.host: str = host
+        self.port: int = port
+        self.received: int = 0
+        self.rejected: int = 0
+        self.duplicates: int = 0
+        self.app: web.Application = web.Application()
+        if self.secret is not None:
+            self.app.router.add_post(path, self.receive)
+        self._seen: OrderedDict = OrderedDict()
+        self._runner: Optional[web.AppRunner] = None
+
+    def add_token_route(self,
+                        path: str,
+                        lookup: Callable[[str], Awaitable[Optional[dict]]],
+                        handler: Callable[[str, dict, dict], Awaitable]) -> None:
+        """
+        Receive deliveries signed with a secret of their own, looked up by a token in the path
+
+        :param path: The path deliveries are POSTed to, with a {token} placeholder
+        :param lookup: The coroutine function returning the document of a token with its secret under 'secret',
+                       None if the token is unknown
+        :param handler: The coroutine function called with the event name, the payload and the token's document
+        """
+
+        async def receive(request: web.Request) -> web.Response:
+            if (doc := await lookup(request.match_info['token'])) is None:
+                return web.Response(status=404)
+            return await self._accept(request, doc['secret'].encode(),
+                                      lambda event, payload: handler(event, payload, doc))
+
+        self.app.router.add_post(path, receive)
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def receive(self, request: web.Request) -> web.Response:
+        return await self._accept(request, self.secret, self.handler)
+
+    async def _accept(self,
+                      request: web.Request,
+                      secret: bytes,
+                      handler: Callable[[str, dict], Awaitable]) -> web.Response:
+        body: bytes = await request.read()
+        if not verify_signature(secret, body, request.headers.get('X-Hub-Signature-256')):
+            self.rejected += 1
+            return web.Response(status=401)
+        try:
+            payload: dict = json.loads(body)
+        except ValueError:
+            return web.Response(status=400)
+        self.received += 1
+        if (delivery := request.headers.get('X-GitHub-Delivery')) is not None:
+            if delivery in self._seen:
+                self.duplicates += 1
+                return web.Response(status=204)
+            self._seen[delivery] = None
+            if len(self._seen) > SEEN_DELIVERIES:
+                self._seen.popitem(last=False)
+        if (event := request.headers.get('X-GitHub-Event')) in ACCEPTED_EVENTS:
+            asyncio.ensure_future(handler(event, payload))
+        return web.Response(status=204)
@@ -0,0 +1,140 @@
+import os
+import asyncio
+import hashlib
+from collections import OrderedDict, deque
+from typing import Optional, Union, Dict
+
+MAX_REMEMBERED_TOO_BIG: int = 1024
+
+
+class ZipballStore:
+    """An on-disk, content-addressed cache of repo zipballs with a byte budget and a fair download queue.
+
+    Archives are keyed by the repo and the commit SHA its HEAD resolves to, so a cached archive is never outdated.
+    Concurrent requests for the same archive share one download, and when all download slots are busy,
+    the rest wait in FIFO order - a freed slot is handed straight to the longest waiting download,
+    so a newly started one can't take it first.
+
+    Parameters
+    ----------
+    github: :class:`core.net.github.api.GitHubAPI`
+        The GitHub API instance to download with.
+    directory: :class:`str`
+        The directory to keep the archives in.
+    max_bytes: :class:`int`
+        The combined size of the archives to keep, least recently used archives are removed first.
+    max_downloads: :class:`int`
+        The amount of downloads that can run at the same time.
+    """
+
+    def __init__(self, github, directory: str, max_bytes: int, max_downloads: int):
+        self.github = github
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.shared: int = 0
+        self._index: OrderedDict = OrderedDict()  # filename -> size, least recently used first
+        self._too_big: OrderedDict = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._free_slots: int = max_downloads
+        self._waiters: deque = deque()  # futures of downloads waiting for a slot, oldest first
+        os.makedirs(directory, exist_ok=True)
+        for entry in sorted(os.scandir(directory), key=lambda e: e.stat().st_mtime):
+            if entry.name.endswith('.part'):  # left behind by an interrupted download
+                os.remove(entry.path)
+            else:
+                self._index[entry.name] = entry.stat().st_size
+                self.size += self._index[entry.name]
+        self._evict()
+
+    @property
+    def busy(self) -> bool:
+        return self._free_slots == 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def _acquire(self) -> None:
+        if self._free_slots and not self._waiters:
+            self._free_slots -= 1
+            return
+        waiter: asyncio.Future = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():  # the slot was handed over already, pass it on
+                self._release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            if not (waiter := self._waiters.popleft()).done():
+                waiter.set_result(None)
+                return
+        self._free_slots += 1
+
+    async def get(self, repo: str) -> Optional[Union[bool, str]]:
+        """
+        Get the path of a repo's zipball, downloading it if it isn't cached
+
+        :param repo: The repo in the owner/name format
+        :return: The path to the archive, False if the archive is too big, None if the repo doesn't exist
+        """
+
+        if (sha := await self.github.get_head_sha(repo)) is None:
+            return None
+        name: str = hashlib.sha256(f'{repo.lower()}@{sha}'.encode()).hexdigest() + '.zip'
+        if name in self._too_big:
+            return False
+        if name in self._index and os.path.exists(path := os.path.join(self.directory, name)):
+            self._index.move_to_end(name)
+            self.hits += 1
+            return path
+        if (future := self._inflight.get(name)) is not None:
+            self.shared += 1
+        else:
+            self.misses += 1
+            future: asyncio.Future = asyncio.ensure_future(self._download(repo, sha, name))
+            future.add_done_callback(lambda _: self._inflight.pop(name, None))
+            self._inflight[name] = future
+        return await asyncio.shield(future)
+
+    async def _download(self, repo: str, sha: str, name: str) -> Optional[Union[bool, str]]:
+        await self._acquire()
+        try:
+            path: str = os.path.join(self.directory, name)
+            try:
+                with open(path + '.part', 'wb') as fp:
+                    result: Optional[bool] = await self.github.get_repo_zip(repo, sha, fp)
+            except BaseException:
+                os.remove(path + '.part')
+                raise
+            if result is not True:
+                os.remove(path + '.part')
+                if result is False:
+                    self._too_big[name] = None
+                    if len(self._too_big) > MAX_REMEMBERED_TOO_BIG:
+                        self._too_big.popitem(last=False)
+                return result
+            os.replace(path + '.part', path)
+            self._index[name] = os.path.getsize(path)
+            self.size += self._index[name]
+            self._evict()
+            return path
+        finally:
+            self._release()
+
+    def _evict(self) -> None:
+        while self.size > self.max_bytes and self._index:
+            name, size = self._index.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
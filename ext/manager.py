@@ -1,5 +1,5 @@
 import json
-import re
+import asyncio
 import os
 import functools
 import operator
@@ -8,12 +8,63 @@ from colorama import Style, Fore
 from motor.motor_asyncio import AsyncIOMotorClient
 from discord.ext import commands
 from ext.typehints import DictSequence, AnyDict, Identifiable
-from ext.structs import DirProxy, DictProxy, GitCommandData, UserCollection
+from ext.structs import DirProxy, DictProxy, GitCommandData, UserCollection, GuildCollection, FeedSubscriptionCollection, \
+    CommitFeedCollection
 from ext import regex as r
-from typing import Optional, Union, Callable, Any, Reversible, List, Iterable, Coroutine, Tuple
+from typing import Optional, Union, Callable, Any, Reversible, List, Iterable, Tuple, Dict
 from fuzzywuzzy import fuzz
 
 
+class Formatter:
+    """Formats locale strings in the locale of a command invocation. Meant for binding to Context.
+
+    Parameters
+    ----------
+    mgr: :class:`Manager`
+        The Manager holding the compiled locale tables.
+    ctx: :class:`commands.Context`
+        The command invocation context whose locale to use.
+    """
+
+    __slots__: tuple = ('mgr', 'ctx', 'prefix')
+
+    def __init__(self, mgr: 'Manager', ctx: commands.Context):
+        self.mgr: Manager = mgr
+        self.ctx: commands.Context = ctx
+        self.prefix: str = ''
+
+    def __call__(self, resource: str, /, *args) -> str:
+        resource: str = self.prefix + resource if not resource.startswith(self.prefix) else resource
+        try:
+            return self.mgr.locale_tables[self.ctx.l.meta.name][resource].format(*args)
+        except IndexError:
+            return self.mgr.locale_tables[self.mgr.locale.master.meta.name][resource].format(*args)
+
+    def set_prefix(self, prefix: str) -> None:
+        self.prefix: str = prefix.strip() + ' '
+
+
+class ErrorBinder:
+    """Manager.error bound to a command invocation context. Meant for binding to Context.
+
+    Parameters
+    ----------
+    mgr: :class:`Manager`
+        The Manager to send errors with.
+    ctx: :class:`commands.Context`
+        The command invocation context to send errors to.
+    """
+
+    __slots__: tuple = ('mgr', 'ctx')
+
+    def __init__(self, mgr: 'Manager', ctx: commands.Context):
+        self.mgr: Manager = mgr
+        self.ctx: commands.Context = ctx
+
+    async def __call__(self, msg: str, **kwargs) -> None:
+        await self.mgr.error(self.ctx, msg, **kwargs)
+
+
 class Manager:
     """
     A class containing database, locale and utility functions
@@ -28,24 +79,23 @@ class Manager:
         self.git = github
         self.db: AsyncIOMotorClient = AsyncIOMotorClient(os.getenv('DB_CONNECTION')).store
         self.e: DictProxy = self.load_json('emoji')
-        self.l: DirProxy = DirProxy('data/locale/', '.json', exclude='index.json')
         self.locale: DictProxy = self.load_json('locale/index')
+        self.master_name: str = self.locale.master
+        self.locale_tables: Dict[str, Dict[str, Any]] = {}  # locale name -> flat, space-separated key -> value
+        self.l: DirProxy = DirProxy('data/locale/', '.json', exclude='index.json',
+                                    lazy=True, transform=self.__compile_locale)
         self.licenses: DictProxy = self.load_json('licenses')
-        self.patterns: tuple = ((r.GITHUB_LINES_RE, 'lines'),
-                                (r.GITLAB_LINES_RE, 'lines'),
-                                (r.ISSUE_RE, 'issue'),
-                                (r.PR_RE, 'pr'),
-                                (r.REPO_RE, 'repo'),
-                                (r.USER_ORG_RE, 'user_org'))
+        self.patterns: tuple = r.LINK_PATTERNS
         self.type_to_func: dict = {'repo': self.git.get_repo,
                                    'user_org': None,
                                    'issue': self.git.get_issue,
                                    'pr': self.git.get_pull_request,
                                    'lines': 'lines'}
-        self.locale_cache: dict = {}
-        setattr(self.locale, 'master', self.l.en)
+        setattr(self.locale, 'master', getattr(self.l, self.master_name))
         setattr(self.db, 'users', UserCollection(self.db.users, self.git, self))
-        self.__fix_missing_locales()
+        setattr(self.db, 'guilds', GuildCollection(self.db.guilds))
+        setattr(self.db, 'feed_subscriptions', FeedSubscriptionCollection(self.db.feed_subscriptions))
+        setattr(self.db, 'commit_feeds', CommitFeedCollection(self.db.commit_feeds))
 
     def log(self,
             message: str,
@@ -120,26 +170,59 @@ class Manager:
         :return: The command data requested
         """
 
-        for pattern in self.patterns:
-            match: list = re.findall(pattern[0], link)
-            if match:
-                match: Union[str, tuple] = match[0]
-                action: Optional[Union[Callable, str]] = self.type_to_func[pattern[1]]
-                if isinstance(action, str):
-                    return GitCommandData(link, 'lines', link)
-                if isinstance(match, tuple) and action:
-                    match: tuple = tuple(i if not i.isnumeric() else int(i) for i in match)
-                    obj: Union[dict, str] = await action(match[0], int(match[1]))
-                    if isinstance(obj, str):
-                        return obj, pattern[1]
-                    return GitCommandData(obj, pattern[1], match)
-                if not action:
-                    if (obj := await self.git.get_user((m := match))) is None:
-                        obj: Optional[dict] = await self.git.get_org(m)
-                        return GitCommandData(obj, 'org', m) if obj is not None else 'no-user-or-org'
-                    return GitCommandData(obj, 'user', m)
-                repo = await action(match)
-                return GitCommandData(repo, pattern[1], match) if repo is not None else 'repo'
+        if (matched := r.match_link(link)) is not None:
+            return await self.resolve_link(link, *matched)
+
+    async def get_link_references(self,
+                                  text: str,
+                                  exclude: Iterable[str] = (),
+                                  limit: Optional[int] = None) -> List[Union[GitCommandData, str, tuple]]:
+        """
+        Get the command data of every distinct link in a text, resolving them concurrently
+
+        :param text: The text to look for links in, usually message content
+        :param exclude: The link types to skip, as in Manager.patterns
+        :param limit: The maximum amount of links to resolve, None for no limit
+        :return: The command data of the links, in order of appearance
+        """
+
+        links: dict = {}
+        for token in text.split():
+            if limit is not None and len(links) >= limit:
+                break
+            if token not in links and (matched := r.match_link(token)) is not None and matched[0] not in exclude:
+                links[token] = matched
+        return list(await asyncio.gather(*(self.resolve_link(link, *matched) for link, matched in links.items())))
+
+    async def resolve_link(self,
+                           link: str,
+                           type_: str,
+                           match: Union[str, tuple]) -> Union[GitCommandData, str, tuple]:
+        """
+        Get the command data of a classified link
+
+        :param link: The link
+        :param type_: The type of the link, as in Manager.patterns
+        :param match: The groups of the pattern the link matched
+        :return: The command data requested
+        """
+
+        action: Optional[Union[Callable, str]] = self.type_to_func[type_]
+        if isinstance(action, str):
+            return GitCommandData(link, 'lines', link)
+        if isinstance(match, tuple) and action:
+            match: tuple = tuple(i if not i.isnumeric() else int(i) for i in match)
+            obj: Union[dict, str] = await action(match[0], int(match[1]))
+            if isinstance(obj, str):
+                return obj, type_
+            return GitCommandData(obj, type_, match)
+        if not action:
+            if (obj := await self.git.get_user((m := match))) is None:
+                obj: Optional[dict] = await self.git.get_org(m)
+                return GitCommandData(obj, 'org', m) if obj is not None else 'no-user-or-org'
+            return GitCommandData(obj, 'user', m)
+        repo = await action(match)
+        return GitCommandData(repo, type_, match) if repo is not None else 'repo'
 
     async def get_most_common(self, items: Union[list, tuple]) -> Any:
         """
@@ -204,15 +287,15 @@ class Manager:
 
         await ctx.send(f'{self.e.err}  {msg}', **kwargs)
 
-    def error_ctx_bindable(self, ctx: commands.Context) -> functools.partial[Coroutine]:
+    def error_ctx_bindable(self, ctx: commands.Context) -> ErrorBinder:
         """
         Manager.error with the Context parameter removed
 
         :param ctx: The command invocation context
-        :return: A partial version of Manager.error bindable to Context
+        :return: A version of Manager.error bindable to Context
         """
 
-        return functools.partial(self.error, ctx)
+        return ErrorBinder(self, ctx)
 
     async def get_locale(self, __id: Identifiable) -> DictProxy:
         """
@@ -222,20 +305,22 @@ class Manager:
         :return: The locale associated with the user
         """
 
-        _id: int = __id if not isinstance(__id, commands.Context) else __id.author.id
-        locale: str = self.locale.master.meta.name
-        if cached := self.locale_cache.get(_id, None):
-            locale: str = cached
-        else:
-            stored: Optional[str] = await self.db.users.getitem(__id, 'locale')
-            if stored:
-                locale: str = stored
-                self.locale_cache[_id] = locale
+        locale: str = await self.db.users.getitem(__id, 'locale') or self.locale.master.meta.name
         try:
             return getattr(self.l, locale)
         except AttributeError:
             return self.locale.master
 
+    async def get_unfurl(self, guild_id: int) -> bool:
+        """
+        Check whether a guild opted into having links sent in it previewed automatically
+
+        :param guild_id: The ID of the guild
+        :return: Whether links should be unfurled
+        """
+
+        return await self.db.guilds.unfurl(guild_id)
+
     def get_nested_key(self, dict_: AnyDict, key_: Union[Iterable[str], str]) -> Any:
         """
         Get a nested dictionary key
@@ -285,61 +370,77 @@ class Manager:
                 if v == attribute or match > 80:
                     return locale, match == 100
 
-    def fix_dict(self, dict_: AnyDict, ref_: AnyDict, locale: bool = False) -> AnyDict:
+    def flatten_dict(self, dict_: AnyDict) -> Dict[str, Any]:
         """
-        Add missing keys to the dictionary
+        Flatten a nested dictionary into a single level one, with keys joined by spaces like in get_nested_key
 
-        :param dict_: The dictionary to fix
-        :param ref_: The dictionary to refer to when getting the keys
-        :param locale: Whether the dictionaries are locales (logging)
-        :return: The fixed dict
+        :param dict_: The dictionary to flatten
+        :return: The flattened dictionary
         """
 
-        def recursively_fix(node: AnyDict, ref: AnyDict) -> AnyDict:
-            for k, v in ref.items():
-                if k not in node:
-                    if locale:
-                        self.log(f'missing key {k} patched.', f'locale-{Fore.LIGHTYELLOW_EX}{dict_.meta.name}')
-                    node[k] = v if not isinstance(v, dict) else DictProxy(v)
-            for k, v in node.items():
-                if isinstance(v, (DictProxy, dict)):
-                    node[k] = recursively_fix(v, ref[k])
-            return node
-
-        return recursively_fix(dict_, ref_)
+        flat: Dict[str, Any] = {}
+        for k, v in dict_.items():
+            if isinstance(v, dict):
+                flat.update({f'{k} {k_}': v_ for k_, v_ in self.flatten_dict(v).items()})
+            else:
+                flat[k] = v
+        return flat
 
-    def __fix_missing_locales(self):
+    def unflatten_dict(self, flat: Dict[str, Any]) -> dict:
         """
-        Fill in locales with missing keys with the Master locale
+        Reverse flatten_dict
+
+        :param flat: The flattened dictionary
+        :return: The nested dictionary
         """
 
-        for locale in self.l:
-            if locale != self.locale.master and 'meta' in locale:
-                setattr(self.l, locale.meta.name, self.fix_dict(locale, self.locale.master, locale=True))
+        dict_: dict = {}
+        for k, v in flat.items():
+            *path, last = k.split()
+            functools.reduce(lambda node, key: node.setdefault(key, {}), path, dict_)[last] = v
+        return dict_
 
-    def fmt(self, ctx: commands.Context) -> object:
+    def __compile_locale(self, locale: DictProxy) -> DictProxy:
         """
-        Instantiate a new Formatter object. Meant for binding to Context.
+        Merge a locale with the Master locale and flatten it into a lookup table for the Formatter
 
-        :param ctx: The command invocation Context
-        :return: The Formatter object created with the Context
+        :param locale: The locale as read from its file
+        :return: The merged locale
+        """
+
+        if 'meta' not in locale:
+            return locale
+        table: Dict[str, Any] = self.flatten_dict(locale)
+        if locale.meta.name != self.master_name:
+            master: Dict[str, Any] = self.locale_tables[self.master_name]
+            for k in master.keys() - table.keys():
+                self.log(f'missing key {k} patched.', f'locale-{Fore.LIGHTYELLOW_EX}{locale.meta.name}')
+            table: Dict[str, Any] = {**master, **table}
+            locale: DictProxy = DictProxy(self.unflatten_dict(table))
+        self.locale_tables[locale.meta.name] = table
+        return locale
+
+    def reload_locales(self) -> List[str]:
         """
+        Read the locale files modified since they were loaded again
 
-        self_: Manager = self
+        :return: The names of the locales reloaded
+        """
 
-        class _Formatter:
-            def __init__(self, ctx_: commands.Context):
-                self.ctx: commands.Context = ctx_
-                self.prefix: str = ''
+        if not self.l.reload(self.master_name):
+            return self.l.reload_changed()
+        setattr(self.locale, 'master', getattr(self.l, self.master_name))
+        for name in (loaded := self.l.loaded):
+            if name != self.master_name:
+                self.l.reload(name, force=True)  # merged with the outdated Master locale
+        return loaded
 
-            def __call__(self, resource: Union[tuple, str, list], /, *args) -> str:
-                resource: str = self.prefix + resource if not resource.startswith(self.prefix) else resource
-                try:
-                    return self_.get_nested_key(self.ctx.l, resource).format(*args)
-                except IndexError:
-                    return self_.get_nested_key(self_.locale.master, resource).format(*args)
+    def fmt(self, ctx: commands.Context) -> Formatter:
+        """
+        Instantiate a new Formatter object. Meant for binding to Context.
 
-            def set_prefix(self, prefix: str) -> None:
-                self.prefix: str = prefix.strip() + ' '
+        :param ctx: The command invocation Context
+        :return: The Formatter object created with the Context
+        """
 
-        return _Formatter(ctx)
+        return Formatter(self, ctx)
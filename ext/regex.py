@@ -1,10 +1,42 @@
 import re
+from typing import Optional, Tuple, Union, List
 
 REPO_RE = re.compile(r'https://github\.com/([a-zA-Z0-9-_]+/[A-Za-z0-9_.-]+)')
 USER_ORG_RE = re.compile(r'https://github\.com/([a-zA-Z0-9-_]+)')
 PR_RE = re.compile(r'https://github\.com/([a-zA-Z0-9-_]+/[A-Za-z0-9_.-]+)/pull/(\d+)')
 ISSUE_RE = re.compile(r'https://github\.com/([a-zA-Z0-9-_]+/[A-Za-z0-9_.-]+)/issues/(\d+)')
 MD_EMOJI_RE = re.compile(r':.*:', re.IGNORECASE)
+COMMIT_SHA_RE = re.compile(r'^(?:[0-9a-f]{40}|[0-9a-f]{64})$', re.IGNORECASE)
 
 GITHUB_LINES_RE = re.compile(r'github\.com/([a-zA-Z0-9-_]+/[A-Za-z0-9_.-]+)/blob/(.+?)/(.+?)#L(\d+)[-~]?L?(\d*)')
 GITLAB_LINES_RE = re.compile(r'gitlab\.com/([a-zA-Z0-9-_]+/[A-Za-z0-9_.-]+)/-/blob/(.+?)/(.+?)#L(\d+)-?(\d*)')
+
+LINK_PATTERNS: tuple = ((GITHUB_LINES_RE, 'lines'),
+                        (GITLAB_LINES_RE, 'lines'),
+                        (ISSUE_RE, 'issue'),
+                        (PR_RE, 'pr'),
+                        (REPO_RE, 'repo'),
+                        (USER_ORG_RE, 'user_org'))
+# All of LINK_PATTERNS as one alternation, tried in order of priority. The scheme is optional in the patterns lacking it,
+# so that they start matching at the same position as the rest and don't lose to a less specific pattern.
+LINK_RE = re.compile('|'.join(f'(?P<_{i}>{"" if p.pattern.startswith("https://") else "(?:https://)?"}{p.pattern})'
+                              for i, (p, _) in enumerate(LINK_PATTERNS)))
+_LINK_GROUP_OFFSETS: List[int] = [LINK_RE.groupindex[f'_{i}'] for i in range(len(LINK_PATTERNS))]
+
+
+def match_link(link: str) -> Optional[Tuple[str, Union[str, tuple]]]:
+    """
+    Classify a link with a single regex search
+
+    :param link: The link to classify
+    :return: The type of the link and the groups of the pattern it matched,
+             a string if the pattern has a single group, like :func:`re.findall`, None if nothing matched
+    """
+
+    if (match := LINK_RE.search(link)) is None:
+        return None
+    index: int = int(match.lastgroup[1:])
+    pattern, type_ = LINK_PATTERNS[index]
+    offset: int = _LINK_GROUP_OFFSETS[index]
+    groups: tuple = match.groups()[offset:offset + pattern.groups]
+    return type_, groups[0] if len(groups) == 1 else groups
@@ -1,5 +1,10 @@
 from .proxies.dir_proxy import DirProxy
 from .proxies.dict_proxy import DictProxy
 from .db.user_collection import UserCollection
+from .db.guild_collection import GuildCollection
+from .db.feed_subscription_collection import FeedSubscriptionCollection
+from .db.commit_feed_collection import CommitFeedCollection
 from .case_insensitive_dict import CaseInsensitiveDict
+from .cache import TTLCache, LRUDict
+from .timing_wheel import TimingWheel
 from .simple import *
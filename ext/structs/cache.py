@@ -0,0 +1,292 @@
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Hashable, Optional, Tuple, Callable, Iterator, Iterable, Dict, Set
+
+__all__: tuple = (
+    'TTLCache',
+    'LRUDict',
+    'deep_sizeof',
+    'MISS',
+    'FRESH',
+    'STALE'
+)
+
+MISS: int = 0
+FRESH: int = 1
+STALE: int = 2
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    Approximate the memory footprint of a JSON-like object
+
+    :param obj: The object to measure
+    :return: The approximate size in bytes
+    """
+
+    size: int = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k) + deep_sizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(i) for i in obj)
+    return size
+
+
+class _Entry:
+    __slots__: tuple = ('value', 'size', 'expires_at', 'stale_until')
+
+    def __init__(self, value: Any, size: int, expires_at: float, stale_until: float):
+        self.value: Any = value
+        self.size: int = size
+        self.expires_at: float = expires_at
+        self.stale_until: float = stale_until
+
+
+class _TagIndex:
+    __slots__: tuple = ('tags', 'keys_by_tag')
+
+    def __init__(self, tags: Callable[[Hashable], Iterable[Hashable]]):
+        self.tags: Callable[[Hashable], Iterable[Hashable]] = tags
+        self.keys_by_tag: Dict[Hashable, Set[Hashable]] = {}
+
+    def add(self, key: Hashable) -> None:
+        for tag in self.tags(key):
+            self.keys_by_tag.setdefault(tag, set()).add(key)
+
+    def discard(self, key: Hashable) -> None:
+        for tag in self.tags(key):
+            if (keys := self.keys_by_tag.get(tag)) is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.keys_by_tag[tag]
+
+    def keys(self, tag: Hashable) -> list:
+        return list(self.keys_by_tag.get(tag, ()))
+
+    def clear(self) -> None:
+        self.keys_by_tag.clear()
+
+
+class TTLCache:
+    """A bounded LRU cache with per-entry time-to-live and an optional stale window.
+
+    Entries past their TTL, but still inside of their stale window, are returned with the :data:`STALE` state,
+    so that the caller can serve them while refreshing them in the background.
+
+    Parameters
+    ----------
+    max_size: :class:`int`
+        The maximum combined size of the stored values in bytes, as approximated by :func:`deep_sizeof`.
+    max_entries: :class:`Optional[:class:`int`]`
+        The maximum amount of entries, None for no limit.
+    sizeof: :class:`Callable[[:class:`Any`], :class:`int`]`
+        The function used to measure stored values.
+    tags: :class:`Optional[:class:`Callable[[:class:`Hashable`], :class:`Iterable[:class:`Hashable`]`]`]`
+        A function returning the tags of a key, entries can then be dropped by tag with :meth:`invalidate_tag`.
+    """
+
+    def __init__(self,
+                 max_size: int,
+                 max_entries: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = deep_sizeof,
+                 tags: Optional[Callable[[Hashable], Iterable[Hashable]]] = None):
+        self.max_size: int = max_size
+        self.max_entries: Optional[int] = max_entries
+        self.size: int = 0
+        self.hits: int = 0
+        self.stale_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._sizeof: Callable[[Any], int] = sizeof
+        self._entries: OrderedDict = OrderedDict()
+        self._tags: Optional[_TagIndex] = _TagIndex(tags) if tags is not None else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, count=False)[1] != MISS
+
+    def get(self, key: Hashable, count: bool = True) -> Tuple[Any, int]:
+        """
+        Get a value from the cache
+
+        :param key: The key to look up
+        :param count: Whether to record the lookup in the hit/miss counters
+        :return: A tuple of the value (None on a miss) and its state - MISS, FRESH or STALE
+        """
+
+        entry: Optional[_Entry] = self._entries.get(key)
+        now: float = time.monotonic()
+        if entry is None or now >= entry.stale_until:
+            if entry is not None:
+                self._remove(key)
+            if count:
+                self.misses += 1
+            return None, MISS
+        self._entries.move_to_end(key)
+        if now < entry.expires_at:
+            if count:
+                self.hits += 1
+            return entry.value, FRESH
+        if count:
+            self.stale_hits += 1
+        return entry.value, STALE
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale: float = 0) -> None:
+        """
+        Store a value in the cache, evicting the least recently used entries if needed
+
+        :param key: The key to store the value under
+        :param value: The value to store
+        :param ttl: The amount of seconds the value is considered fresh for
+        :param stale: The amount of seconds after the TTL the value can still be served while revalidating
+        """
+
+        if key in self._entries:
+            self._remove(key)
+        size: int = self._sizeof(value)
+        if size > self.max_size:
+            return
+        now: float = time.monotonic()
+        self._entries[key] = _Entry(value, size, now + ttl, now + ttl + stale)
+        self.size += size
+        if self._tags is not None:
+            self._tags.add(key)
+        while self.size > self.max_size or (self.max_entries is not None and len(self._entries) > self.max_entries):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        Remove a single entry from the cache
+
+        :param key: The key of the entry
+        :return: Whether the entry existed
+        """
+
+        if key in self._entries:
+            self._remove(key)
+            return True
+        return False
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Remove every entry whose key matches the predicate
+
+        :param predicate: The function to check the keys with
+        :return: The amount of entries removed
+        """
+
+        to_remove: list = [k for k in self._entries if predicate(k)]
+        for k in to_remove:
+            self._remove(k)
+        return len(to_remove)
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        """
+        Remove every entry whose key has a tag, without going through the other entries
+
+        :param tag: The tag to remove the entries of
+        :return: The amount of entries removed
+        """
+
+        if self._tags is None:
+            raise TypeError('TTLCache was constructed without a tags function')
+        to_remove: list = self._tags.keys(tag)
+        for k in to_remove:
+            self._remove(k)
+        return len(to_remove)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+        if self._tags is not None:
+            self._tags.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size': self.size,
+                'max_size': self.max_size}
+
+    def _remove(self, key: Hashable) -> None:
+        self.size -= self._entries.pop(key).size
+        if self._tags is not None:
+            self._tags.discard(key)
+
+
+class LRUDict(MutableMapping):
+    """A mapping bounded by the combined size of its values, evicting the least recently used items first.
+
+    Parameters
+    ----------
+    max_size: :class:`int`
+        The maximum combined size of the stored values in bytes, as approximated by :func:`deep_sizeof`.
+    sizeof: :class:`Callable[[:class:`Any`], :class:`int`]`
+        The function used to measure stored values.
+    tags: :class:`Optional[:class:`Callable[[:class:`Hashable`], :class:`Iterable[:class:`Hashable`]`]`]`
+        A function returning the tags of a key, items can then be dropped by tag with :meth:`delete_tag`.
+    """
+
+    def __init__(self,
+                 max_size: int,
+                 sizeof: Callable[[Any], int] = deep_sizeof,
+                 tags: Optional[Callable[[Hashable], Iterable[Hashable]]] = None):
+        self.max_size: int = max_size
+        self.size: int = 0
+        self.evictions: int = 0
+        self._sizeof: Callable[[Any], int] = sizeof
+        self._items: OrderedDict = OrderedDict()
+        self._tags: Optional[_TagIndex] = _TagIndex(tags) if tags is not None else None
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value, _ = self._items[key]
+        self._items.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if key in self._items:
+            del self[key]
+        size: int = self._sizeof(value)
+        if size > self.max_size:
+            return
+        self._items[key] = value, size
+        self.size += size
+        if self._tags is not None:
+            self._tags.add(key)
+        while self.size > self.max_size:
+            del self[next(iter(self._items))]
+            self.evictions += 1
+
+    def __delitem__(self, key: Hashable) -> None:
+        self.size -= self._items.pop(key)[1]
+        if self._tags is not None:
+            self._tags.discard(key)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def delete_tag(self, tag: Hashable) -> int:
+        """
+        Remove every item whose key has a tag, without going through the other items
+
+        :param tag: The tag to remove the items of
+        :return: The amount of items removed
+        """
+
+        if self._tags is None:
+            raise TypeError('LRUDict was constructed without a tags function')
+        to_remove: list = self._tags.keys(tag)
+        for k in to_remove:
+            del self[k]
+        return len(to_remove)
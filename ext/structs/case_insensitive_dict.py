@@ -7,6 +7,8 @@ class CaseInsensitiveDict(dict):
     Due to the casefold() calls, it only accepts :class:`str` as keys
     """
 
+    __slots__: tuple = ()
+
     def __contains__(self, key: str) -> bool:
         return super().__contains__(key.casefold())
 
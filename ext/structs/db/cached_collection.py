@@ -0,0 +1,131 @@
+import copy
+import logging
+from pymongo.errors import PyMongoError
+from motor.motor_asyncio import AsyncIOMotorCollection
+from typing import Optional, Any
+from ..cache import TTLCache, MISS
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class CachedCollection(AsyncIOMotorCollection):
+    """A wrapper around :class:`AsyncIOMotorCollection` caching documents by ID in front of the database.
+
+    Every write made through the collection invalidates the documents its filter targets (the whole cache
+    if the filter isn't by ID), so reads after a write always see it. Writes made by other processes are only
+    picked up after ``ttl``, unless :meth:`watch_invalidations` is running.
+
+    Parameters
+    ----------
+    collection: :class:`AsyncIOMotorCollection`
+        The collection to add methods to.
+    max_size: :class:`int`
+        The maximum combined size of the cached documents in bytes.
+    ttl: :class:`float`
+        The amount of seconds a cached document is used for.
+    projection: :class:`Optional[:class:`dict`]`
+        The fields to cache, None for whole documents.
+    """
+
+    def __init__(self,
+                 collection: AsyncIOMotorCollection,
+                 max_size: int,
+                 ttl: float,
+                 projection: Optional[dict] = None):
+        super().__init__(collection.database, collection.name)
+        self.cache: TTLCache = TTLCache(max_size)
+        self.ttl: float = ttl
+        self.projection: Optional[dict] = projection
+        self.watching: bool = False
+        self._writes: int = 0
+
+    async def get_cached(self, _id: Any) -> Optional[dict]:
+        """
+        Get a document by its ID, from the cache if possible
+
+        :param _id: The ID of the document
+        :return: A copy of the document limited to the projection, None if it doesn't exist
+        """
+
+        doc, state = self.cache.get(_id)
+        if state == MISS:
+            writes: int = self._writes
+            doc: Optional[dict] = await self.find_one({'_id': _id}, self.projection)
+            if writes == self._writes:  # a write during the read could've made the document outdated already
+                self.cache.set(_id, doc, self.ttl)
+        return copy.deepcopy(doc)
+
+    def invalidate(self, filter_: Optional[dict] = None) -> None:
+        """
+        Drop the cached documents a filter targets
+
+        :param filter_: The filter of a write, None to clear the whole cache
+        """
+
+        self._writes += 1
+        if isinstance(filter_, dict) and '_id' in filter_:
+            if not isinstance(_id := filter_['_id'], dict):
+                self.cache.invalidate(_id)
+                return
+            if '$in' in _id:
+                for i in _id['$in']:
+                    self.cache.invalidate(i)
+                return
+        self.cache.clear()
+
+    async def watch_invalidations(self) -> None:
+        """
+        Invalidate cached documents as they're changed by any client, requires a replica set
+        """
+
+        if self.watching:
+            return
+        self.watching = True
+        try:
+            async with self.watch() as stream:
+                async for change in stream:
+                    self.invalidate(change.get('documentKey'))
+        except PyMongoError as e:
+            logger.warning(f'Stopped watching {self.name} for changes: {e}')
+        finally:
+            self.watching = False
+
+    async def insert_one(self, document: dict, *args, **kwargs):
+        result = await super().insert_one(document, *args, **kwargs)
+        self.invalidate(document)
+        return result
+
+    async def replace_one(self, filter_: dict, *args, **kwargs):
+        result = await super().replace_one(filter_, *args, **kwargs)
+        self.invalidate(filter_)
+        return result
+
+    async def update_one(self, filter_: dict, *args, **kwargs):
+        result = await super().update_one(filter_, *args, **kwargs)
+        self.invalidate(filter_)
+        return result
+
+    async def update_many(self, filter_: dict, *args, **kwargs):
+        result = await super().update_many(filter_, *args, **kwargs)
+        self.invalidate(filter_)
+        return result
+
+    async def delete_one(self, filter_: dict, *args, **kwargs):
+        result = await super().delete_one(filter_, *args, **kwargs)
+        self.invalidate(filter_)
+        return result
+
+    async def delete_many(self, filter_: dict, *args, **kwargs):
+        result = await super().delete_many(filter_, *args, **kwargs)
+        self.invalidate(filter_)
+        return result
+
+    async def find_one_and_update(self, filter_: dict, *args, **kwargs):
+        result = await super().find_one_and_update(filter_, *args, **kwargs)
+        self.invalidate(filter_)
+        return result
+
+    async def find_one_and_delete(self, filter_: dict, *args, **kwargs):
+        result = await super().find_one_and_delete(filter_, *args, **kwargs)
+        self.invalidate(filter_)
+        return result
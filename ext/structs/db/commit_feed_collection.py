@@ -0,0 +1,47 @@
+import secrets
+from motor.motor_asyncio import AsyncIOMotorCollection
+from .cached_collection import CachedCollection
+
+COMMIT_FEED_CACHE_MAX_BYTES: int = 2 * (1024 ** 2)
+COMMIT_FEED_CACHE_TTL: int = 10 * 60
+
+
+class CommitFeedCollection(CachedCollection):
+    """A cached wrapper around :class:`AsyncIOMotorCollection` storing the commit feeds set up in guild channels.
+
+    Documents look like ``{'_id': 'URL token', 'secret': 'webhook secret', 'hook': 'webhook id/token',
+    'guild': guild ID, 'channel': channel ID}``. Repos point their webhook at the token's URL on the bot's receiver
+    and sign deliveries with the secret, the bot forwards the commits to the Discord webhook.
+
+    Parameters
+    ----------
+    collection: :class:`AsyncIOMotorCollection`
+        The collection to add methods to.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection):
+        super().__init__(collection, COMMIT_FEED_CACHE_MAX_BYTES, COMMIT_FEED_CACHE_TTL)
+
+    async def ensure_indexes(self) -> None:
+        await self.create_index('guild')
+
+    async def create(self, guild_id: int, channel_id: int, hook: str) -> dict:
+        """
+        Register a commit feed with a fresh URL token and secret
+
+        :param guild_id: The ID of the guild the feed is in
+        :param channel_id: The ID of the channel the feed posts to
+        :param hook: The Discord webhook's "id/token" path
+        :return: The created document
+        """
+
+        doc: dict = {'_id': secrets.token_urlsafe(24), 'secret': secrets.token_hex(20),
+                     'hook': hook, 'guild': guild_id, 'channel': channel_id}
+        await self.insert_one(doc)
+        return doc
+
+    async def remove(self, token: str) -> None:
+        await self.delete_one({'_id': token})
+
+    async def remove_guild(self, guild_id: int) -> None:
+        await self.delete_many({'guild': guild_id})
@@ -0,0 +1,83 @@
+import re
+import pymongo
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorCursor
+from typing import Optional
+
+HOOK_TRUST_PERIOD: timedelta = timedelta(days=7)  # polling resumes if a hook hasn't delivered anything for this long
+
+
+class FeedSubscriptionCollection(AsyncIOMotorCollection):
+    """A wrapper around :class:`AsyncIOMotorCollection` maintaining the repo -> subscribed guilds index of release feeds.
+
+    Documents look like ``{'_id': 'owner/repo', 'guilds': [guild IDs], 'release': 'last seen tag', 'polled_at': datetime}``,
+    with the repo name lowercased. The poll scheduler adds ``next_poll_at``, ``released_at`` and ``cadence``
+    (the average amount of seconds between releases), and repos whose webhook delivers release events to the bot
+    get ``hooked_at``, the time of the hook's last delivery.
+
+    Parameters
+    ----------
+    collection: :class:`AsyncIOMotorCollection`
+        The collection to add methods to.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection):
+        super().__init__(collection.database, collection.name)
+
+    async def ensure_indexes(self) -> None:
+        await self.create_index('guilds')
+        await self.create_index([('polled_at', pymongo.ASCENDING)])
+        await self.create_index([('next_poll_at', pymongo.ASCENDING)])
+
+    async def subscribe(self, repo: str, guild_id: int, release: Optional[str] = None) -> None:
+        await self.update_one({'_id': repo.lower()},
+                              {'$addToSet': {'guilds': guild_id},
+                               '$setOnInsert': {'release': release, 'polled_at': datetime.utcnow()}},
+                              upsert=True)
+
+    async def unsubscribe(self, repo: str, guild_id: int) -> None:
+        await self.update_one({'_id': repo.lower()}, {'$pull': {'guilds': guild_id}})
+        await self.delete_one({'_id': repo.lower(), 'guilds': {'$size': 0}})
+
+    async def unsubscribe_guild(self, guild_id: int) -> None:
+        await self.update_many({'guilds': guild_id}, {'$pull': {'guilds': guild_id}})
+        await self.delete_many({'guilds': {'$size': 0}})
+
+    async def mark_polled(self, repo: str, release: Optional[str], next_poll_at: datetime, **schedule) -> None:
+        await self.update_one({'_id': repo.lower()}, {'$set': {'release': release,
+                                                               'polled_at': datetime.utcnow(),
+                                                               'next_poll_at': next_poll_at,
+                                                               **schedule}})
+
+    async def mark_hooked(self, repo: str, only_if_hooked: bool = False) -> None:
+        """
+        Record a delivery from a repo's webhook, taking the repo off the polling schedule for HOOK_TRUST_PERIOD
+
+        :param repo: The repo the delivery was for
+        :param only_if_hooked: Whether to only refresh repos already known to deliver release events
+        """
+
+        filter_: dict = {'_id': repo.lower()}
+        if only_if_hooked:
+            filter_['hooked_at'] = {'$exists': True}
+        await self.update_one(filter_, {'$set': {'hooked_at': datetime.utcnow()}})
+
+    async def unhook(self, repo: str) -> None:
+        await self.update_one({'_id': repo.lower()}, {'$unset': {'hooked_at': ''}})
+
+    def due(self, now: datetime, limit: int) -> AsyncIOMotorCursor:
+        return self.find({'$and': [
+            {'$or': [{'next_poll_at': {'$lte': now}}, {'next_poll_at': {'$exists': False}}]},
+            {'$or': [{'hooked_at': {'$exists': False}}, {'hooked_at': {'$lt': now - HOOK_TRUST_PERIOD}}]}
+        ]}).sort('next_poll_at', pymongo.ASCENDING).limit(limit)
+
+
+def repo_filter(repo: str) -> dict:
+    """
+    Build a case-insensitive query matching a repo name as stored in a guild's feed
+
+    :param repo: The repo name
+    :return: The query
+    """
+
+    return {'$regex': f'^{re.escape(repo)}$', '$options': 'i'}
@@ -0,0 +1,24 @@
+from motor.motor_asyncio import AsyncIOMotorCollection
+from .cached_collection import CachedCollection
+
+GUILD_CACHE_MAX_BYTES: int = 8 * (1024 ** 2)
+GUILD_CACHE_TTL: int = 10 * 60
+
+
+class GuildCollection(CachedCollection):
+    """A cached wrapper around :class:`AsyncIOMotorCollection` storing the settings of guilds.
+
+    Documents look like ``{'_id': guild ID, 'hook': 'webhook id/token', 'feed': [{'repo': ..., 'release': ...}],
+    'unfurl': bool}``, where every field besides the ID is optional.
+
+    Parameters
+    ----------
+    collection: :class:`AsyncIOMotorCollection`
+        The collection to add methods to.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection):
+        super().__init__(collection, GUILD_CACHE_MAX_BYTES, GUILD_CACHE_TTL)
+
+    async def unfurl(self, guild_id: int) -> bool:
+        return bool((await self.get_cached(guild_id) or {}).get('unfurl'))
@@ -1,11 +1,20 @@
+from pymongo import ReturnDocument
 from motor.motor_asyncio import AsyncIOMotorCollection
 from discord.ext import commands
 from typing import Optional
 from ext.typehints import Identifiable
+from .cached_collection import CachedCollection
 
+SNAPSHOT_PROJECTION: dict = {'locale': 1, 'user': 1, 'org': 1, 'repo': 1}
+USER_CACHE_MAX_BYTES: int = 16 * (1024 ** 2)
+USER_CACHE_TTL: int = 10 * 60
+ONLY_ID: dict = {'$expr': {'$eq': [{'$size': {'$objectToArray': '$$ROOT'}}, 1]}}  # matches documents left with just _id
 
-class UserCollection(AsyncIOMotorCollection):
-    """A wrapper around :class:`AsyncIOMotorCollection` adding methods for simple attribute access and modification.
+
+class UserCollection(CachedCollection):
+    """A cached wrapper around :class:`AsyncIOMotorCollection` adding methods for simple attribute access and modification.
+
+    The fields in SNAPSHOT_PROJECTION are served from the cache, documents of users without any settings included.
 
     Parameters
     ----------
@@ -20,29 +29,49 @@ class UserCollection(AsyncIOMotorCollection):
     """
 
     def __init__(self, collection: AsyncIOMotorCollection, github, mgr):
+        super().__init__(collection, USER_CACHE_MAX_BYTES, USER_CACHE_TTL, SNAPSHOT_PROJECTION)
         self._git = github
         self._mgr = mgr
-        super().__init__(collection.database, collection.name)
+
+    async def snapshot(self, ctx: commands.Context) -> dict:
+        """
+        Get the invoking user's document, looking it up at most once per invocation
+
+        :param ctx: The command invocation context to store the document on
+        :return: The document limited to SNAPSHOT_PROJECTION, empty if the user has none
+        """
+
+        if (doc := getattr(ctx, 'user_doc', None)) is None:
+            doc: dict = await self.get_cached(ctx.author.id) or {}
+            setattr(ctx, 'user_doc', doc)
+        return doc
 
     async def delitem(self,  __id: Identifiable, field: str) -> bool:
+        if (doc := getattr(__id, 'user_doc', None)) is not None:  # keep the invocation's snapshot in sync
+            doc.pop(field, None)
         __id: int = __id if not isinstance(__id, commands.Context) else __id.author.id
-        query: dict = await self.find_one({"_id": __id})
-        if query is not None and field in query:
-            await self.update_one(query, {"$unset": {field: ""}})
-            del query[field]
-            if len(query) == 1:
-                await self.find_one_and_delete({"_id": __id})
-            return True
-        return False
+        query: Optional[dict] = await self.find_one_and_update({'_id': __id, field: {'$exists': True}},
+                                                               {'$unset': {field: ''}},
+                                                               return_document=ReturnDocument.AFTER)
+        if query is None:
+            return False
+        if len(query) == 1:
+            await self.delete_one({'_id': __id, **ONLY_ID})  # re-checked server-side in case of a concurrent setitem
+        return True
 
     async def getitem(self, __id: Identifiable, item: str) -> Optional[str]:
+        if isinstance(__id, commands.Context) and item in SNAPSHOT_PROJECTION:
+            return (await self.snapshot(__id)).get(item)
         __id: int = __id if not isinstance(__id, commands.Context) else __id.author.id
-        query: dict = await self.find_one({'_id': __id})
+        if item in SNAPSHOT_PROJECTION:
+            return (await self.get_cached(__id) or {}).get(item)
+        query: dict = await self.find_one({'_id': __id}, {item: 1})
         if query and item in query:
             return query[item]
         return None
 
     async def setitem(self,  __id: Identifiable, item: str, value: str) -> bool:
+        doc: Optional[dict] = getattr(__id, 'user_doc', None)
         __id: int = __id if not isinstance(__id, commands.Context) else __id.author.id
         valid: bool = True
         if item in ('user', 'repo', 'org'):
@@ -50,11 +79,9 @@ class UserCollection(AsyncIOMotorCollection):
         elif item == 'locale':
             valid: bool = any([l_['name'] == value for l_ in self._mgr.locale.languages])
         if valid:
-            query = await self.find_one({"_id": __id})
-            if query is not None:
-                await self.update_one(query, {"$set": {item: value}})
-            else:
-                await self.insert_one({"_id": __id, item: value})
+            if doc is not None:
+                doc[item] = value
+            await self.update_one({'_id': __id}, {'$set': {item: value}}, upsert=True)
             return True
         return False
 
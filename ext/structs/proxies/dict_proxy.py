@@ -1,10 +1,13 @@
-from typing import Any, Union, Optional, Iterator
+from typing import Any, Union, Optional, Iterator, Tuple
 from ..case_insensitive_dict import CaseInsensitiveDict
 
 
 class DictProxy(CaseInsensitiveDict):
     """A wrapper around :class:`CaseInsensitiveDict` allowing dotted access.
 
+    Keys are casefolded once, on construction, and nested dicts are wrapped in DictProxy lazily,
+    the first time they're accessed, instead of walking the whole tree up front.
+
     .. note::
         Allows :class:`list` as well for ease of use when dealing with JSON files.
 
@@ -14,22 +17,49 @@ class DictProxy(CaseInsensitiveDict):
         The object to wrap with DictProxy.
     """
 
+    __slots__: tuple = ('_list',)
+
     def __init__(self, data: Optional[Union[list, dict]] = None):
         if data is None:
             data: dict = {}
-        self.__items: Union[list, dict] = data
         if isinstance(data, dict):
-            super().__init__(data)
-            for k, v in data.items():
-                setattr(self, k.casefold(), (v if not isinstance(v, dict) else DictProxy(v)))
+            object.__setattr__(self, '_list', None)
+            super().__init__((k.casefold(), v) for k, v in data.items())
         else:
-            self.__getitem__ = lambda i: self.__items[i]
+            object.__setattr__(self, '_list', data)
+            super().__init__()
 
     def __iter__(self) -> Iterator[Any]:
-        yield from self.__items
+        yield from (self._list if self._list is not None else self.keys())
 
-    def __getattr__(self, item: Union[str, int]) -> Any:
-        return super().__getitem__(item)
+    def __getitem__(self, item: Union[str, int]) -> Any:
+        if self._list is not None:
+            return self._list[item]
+        value: Any = super().__getitem__(item)
+        if type(value) is dict:  # wrapped on first access and memoized
+            value: DictProxy = DictProxy(value)
+            super().__setitem__(item, value)
+        return value
+
+    def __getattr__(self, item: str) -> Any:
+        if item.startswith('_'):  # ex. _list before it's set on instances built by copy or pickle
+            raise AttributeError(item)
+        try:
+            return self[item]
+        except KeyError:
+            raise AttributeError(item) from None
 
     def __setattr__(self, key: str, value: Any) -> None:
-        return super().__setitem__(key, value if type(value) != 'dict' else DictProxy(value))
+        if key in self.__slots__:
+            object.__setattr__(self, key, value)
+        else:
+            self[key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def values(self) -> Iterator[Any]:
+        yield from (self[k] for k in self.keys())
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        yield from ((k, self[k]) for k in self.keys())
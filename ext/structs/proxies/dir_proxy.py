@@ -1,7 +1,7 @@
 import os
 import json
 from .dict_proxy import DictProxy
-from typing import Union, Any, Optional
+from typing import Union, Any, Optional, Callable, Dict, Tuple, List
 
 
 class DirProxy:
@@ -14,19 +14,89 @@ class DirProxy:
         A path leading to the directory from which to extract files.
     ext: :class:`Optional[:class:`Union[:class:`str`, :class:`tuple`]`]`
         The extensions to include when mapping, if None, everything will be included.
+    exclude: :class:`Union[:class:`str`, :class:`tuple`]`
+        The filenames to leave out.
+    lazy: :class:`bool`
+        Whether to read files only when they're first accessed, instead of on construction.
+    transform: :class:`Optional[:class:`Callable[[:class:`Any`], :class:`Any`]`]`
+        A function applied to the contents of each file as it's read.
     """
 
-    def __init__(self, path: str, ext: Optional[Union[str, tuple]] = None, exclude: Union[str, tuple] = ()):
-        self.__items: list = []
-        for file in (os.listdir(dir_ := os.path.join(os.getcwd(), path))):
-            if file not in exclude and ext is None or file.endswith(ext):
-                with open(os.path.join(dir_, file), 'r') as fp:
-                    content: Union[DictProxy, str] = DictProxy(json.load(fp)) if file.endswith('.json') else fp.read()
-                    self.__items.append(content)
-                    setattr(self, file[:file.rindex('.')], content)
+    def __init__(self,
+                 path: str,
+                 ext: Optional[Union[str, tuple]] = None,
+                 exclude: Union[str, tuple] = (),
+                 lazy: bool = False,
+                 transform: Optional[Callable[[Any], Any]] = None):
+        self.__dir: str = os.path.join(os.getcwd(), path)
+        self.__transform: Optional[Callable[[Any], Any]] = transform
+        self.__files: Dict[str, str] = {}  # name -> filename
+        self.__loaded: Dict[str, Tuple[Any, float]] = {}  # name -> (content, mtime when read)
+        exclude: tuple = (exclude,) if isinstance(exclude, str) else exclude
+        for file in sorted(os.listdir(self.__dir)):
+            if file not in exclude and (ext is None or file.endswith(ext)):
+                self.__files[file[:file.rindex('.')]] = file
+        if not lazy:
+            for name in self.__files:
+                self.load(name)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if (loaded := self.__loaded.get(name)) is not None:
+            return loaded[0]
+        if name not in self.__files:
+            raise AttributeError(name)
+        return self.load(name)
 
     def __iter__(self):
-        yield from self.__items
+        yield from (getattr(self, name) for name in self.__files)
 
     def __getitem__(self, item: Any) -> Any:
-        return self.__items[item]
+        return getattr(self, list(self.__files)[item])
+
+    @property
+    def loaded(self) -> List[str]:
+        return list(self.__loaded)
+
+    def load(self, name: str) -> Any:
+        """
+        Read a file, replacing its previously read contents
+
+        :param name: The name of the file, without the extension
+        :return: The contents of the file
+        """
+
+        path: str = os.path.join(self.__dir, self.__files[name])
+        mtime: float = os.path.getmtime(path)
+        with open(path, 'r') as fp:
+            content: Union[DictProxy, str] = DictProxy(json.load(fp)) if path.endswith('.json') else fp.read()
+        if self.__transform is not None:
+            content: Any = self.__transform(content)
+        self.__loaded[name] = content, mtime
+        return content
+
+    def reload(self, name: str, force: bool = False) -> bool:
+        """
+        Read a previously read file again if it was modified since
+
+        :param name: The name of the file, without the extension
+        :param force: Whether to read the file even if it wasn't modified
+        :return: Whether the file was read again
+        """
+
+        if name not in self.__loaded:
+            return False
+        if not force and os.path.getmtime(os.path.join(self.__dir, self.__files[name])) == self.__loaded[name][1]:
+            return False
+        self.load(name)
+        return True
+
+    def reload_changed(self) -> List[str]:
+        """
+        Read every previously read file that was modified since again
+
+        :return: The names of the files read again
+        """
+
+        return [name for name in self.loaded if self.reload(name)]
@@ -0,0 +1,31 @@
+import zlib
+from typing import Iterable, List, Callable, TypeVar, Generic
+
+T = TypeVar('T')
+
+
+class TimingWheel(Generic[T]):
+    """A fixed amount of slots recurring work is spread over.
+    Items are assigned to slots by a stable hash of their key, so that an item keeps its slot between cycles
+    and the load of every slot stays roughly even.
+
+    Parameters
+    ----------
+    slots: :class:`int`
+        The amount of slots in the wheel.
+    key: :class:`Callable[[T], :class:`str`]`
+        The function returning the key of an item.
+    """
+
+    def __init__(self, slots: int, key: Callable[[T], str] = str):
+        self.slots: int = slots
+        self.key: Callable[[T], str] = key
+
+    def slot_of(self, item: T) -> int:
+        return zlib.crc32(self.key(item).encode()) % self.slots
+
+    def distribute(self, items: Iterable[T]) -> List[List[T]]:
+        wheel: List[List[T]] = [[] for _ in range(self.slots)]
+        for item in items:
+            wheel[self.slot_of(item)].append(item)
+        return wheel
@@ -0,0 +1,29 @@
+"""
+A one-use script to backfill the feed_subscriptions collection (repo -> subscribed guilds)
+from the feed arrays embedded in the guilds collection.
+"""
+
+from datetime import datetime
+from pymongo import MongoClient, UpdateOne, ASCENDING
+from dotenv import load_dotenv
+from os import getenv
+
+load_dotenv()
+
+db = MongoClient(getenv('DB_CONNECTION'))['store']
+
+ops: list = []
+
+for g in db['guilds'].find():
+    for item in g.get('feed', []):
+        ops.append(UpdateOne({'_id': item['repo'].lower()},
+                             {'$addToSet': {'guilds': g['_id']},
+                              '$setOnInsert': {'release': item['release'], 'polled_at': datetime.utcnow()}},
+                             upsert=True))
+
+print("Writing " + str(len(ops)))
+if ops:
+    db['feed_subscriptions'].bulk_write(ops, ordered=False)
+db['feed_subscriptions'].create_index('guilds')
+db['feed_subscriptions'].create_index([('polled_at', ASCENDING)])
+print("Indexed " + str(db['feed_subscriptions'].count_documents({})) + " repos")